@@ -34,7 +34,12 @@ __all__ = (
     'getnameinfo',
     'wait_socket_readable',
     'wait_socket_writable',
+    'create_memory_byte_stream_pair',
     'create_memory_object_stream',
+    'create_memory_object_broadcast_stream',
+    'create_memory_object_partitioned_stream',
+    'create_memory_object_spilling_stream',
+    'create_memory_object_threadsafe_stream',
     'run_process',
     'open_process',
     'create_lock',
@@ -88,7 +93,10 @@ from ._core._signals import open_signal_receiver
 from ._core._sockets import (
     connect_tcp, connect_unix, create_connected_udp_socket, create_tcp_listener, create_udp_socket,
     create_unix_listener, getaddrinfo, getnameinfo, wait_socket_readable, wait_socket_writable)
-from ._core._streams import create_memory_object_stream
+from ._core._streams import (
+    create_memory_byte_stream_pair, create_memory_object_broadcast_stream,
+    create_memory_object_partitioned_stream, create_memory_object_spilling_stream,
+    create_memory_object_stream, create_memory_object_threadsafe_stream)
 from ._core._subprocesses import open_process, run_process
 from ._core._synchronization import (
     CapacityLimiter, CapacityLimiterStatistics, Condition, ConditionStatistics, Event,
@@ -817,6 +817,11 @@ def run_sync_from_thread(func: Callable[..., T_Retval], *args: object,
     return f.result()
 
 
+def run_sync_soon_from_thread(token: object, func: Callable[..., object],
+                              *args: object) -> None:
+    cast(asyncio.AbstractEventLoop, token).call_soon_threadsafe(func, *args)
+
+
 def run_async_from_thread(
     func: Callable[..., Coroutine[Any, Any, T_Retval]], *args: object
 ) -> T_Retval:
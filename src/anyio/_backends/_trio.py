@@ -9,7 +9,7 @@ from os import PathLike
 from types import TracebackType
 from typing import (
     Any, Awaitable, Callable, Collection, ContextManager, Coroutine, Deque, Dict, Generic, List,
-    Mapping, NoReturn, Optional, Sequence, Set, Tuple, Type, TypeVar, Union)
+    Mapping, NoReturn, Optional, Sequence, Set, Tuple, Type, TypeVar, Union, cast)
 
 import trio.from_thread
 from outcome import Error, Outcome, Value
@@ -173,6 +173,11 @@ run_async_from_thread = trio.from_thread.run
 run_sync_from_thread = trio.from_thread.run_sync
 
 
+def run_sync_soon_from_thread(token: object, func: Callable[..., object],
+                              *args: object) -> None:
+    cast(trio_lowlevel.TrioToken, token).run_sync_soon(func, *args)
+
+
 class BlockingPortal(abc.BlockingPortal):
     def __new__(cls) -> 'BlockingPortal':
         return object.__new__(cls)
@@ -1,42 +1,336 @@
 import math
-from typing import Optional, Tuple, Type, TypeVar, overload
+import pickle
+from functools import partial
+from typing import Any, Callable, Hashable, List, Optional, Tuple, Type, TypeVar, overload
 
 from ..streams.memory import (
-    MemoryObjectReceiveStream, MemoryObjectSendStream, MemoryObjectStreamState)
+    MemoryBytePipe, MemoryByteStream, MemoryObjectBroadcastReceiveStream, MemoryObjectBroadcastSendStream,
+    MemoryObjectBroadcastStreamState, MemoryObjectPartitionedSendStream,
+    MemoryObjectReceiveStream, MemoryObjectSendStream, MemoryObjectSpillingReceiveStream,
+    MemoryObjectSpillingSendStream, MemoryObjectSpillingStreamState, MemoryObjectStreamState,
+    MemoryObjectThreadSafeReceiveStream, MemoryObjectThreadSafeSendStream,
+    MemoryObjectThreadSafeStreamState, OverflowPolicy, SlowConsumerPolicy)
 
 T_Item = TypeVar('T_Item')
 
 
 @overload
 def create_memory_object_stream(
-    max_buffer_size: float, item_type: Type[T_Item]
+    max_buffer_size: float, item_type: Type[T_Item], *, overflow_policy: OverflowPolicy = 'block',
+    coalesce_key: Optional[Callable[[T_Item], Hashable]] = None,
+    max_buffer_bytes: float = math.inf, item_size: Optional[Callable[[T_Item], int]] = None
 ) -> Tuple[MemoryObjectSendStream[T_Item], MemoryObjectReceiveStream[T_Item]]:
     ...
 
 
 @overload
 def create_memory_object_stream(
-    max_buffer_size: float = 0
+    max_buffer_size: float = 0, *, overflow_policy: OverflowPolicy = 'block',
+    coalesce_key: Optional[Callable[[T_Item], Hashable]] = None,
+    max_buffer_bytes: float = math.inf, item_size: Optional[Callable[[T_Item], int]] = None
 ) -> Tuple[MemoryObjectSendStream, MemoryObjectReceiveStream]:
     ...
 
 
 def create_memory_object_stream(
-    max_buffer_size: float = 0, item_type: Optional[Type[T_Item]] = None
+    max_buffer_size: float = 0, item_type: Optional[Type[T_Item]] = None, *,
+    overflow_policy: OverflowPolicy = 'block',
+    coalesce_key: Optional[Callable[[T_Item], Hashable]] = None,
+    max_buffer_bytes: float = math.inf, item_size: Optional[Callable[[T_Item], int]] = None
 ) -> Tuple[MemoryObjectSendStream, MemoryObjectReceiveStream]:
     """
     Create a memory object stream.
 
+    The overflow policy determines what happens when an item is sent while the buffer is full and
+    no task is waiting to receive:
+
+    * ``block``: ``send()`` blocks and ``send_nowait()`` raises :exc:`~anyio.WouldBlock`
+    * ``drop_oldest``: the oldest item in the buffer is discarded to make room for the new one
+    * ``drop_newest``: the new item is discarded
+    * ``coalesce``: if the buffer already holds an item with the same key (as returned by
+      ``coalesce_key``), that item is replaced by the new one, keeping its place in the buffer;
+      otherwise the oldest item is discarded to make room for the new one
+
+    With all policies other than ``block``, sending never blocks. The numbers of discarded and
+    replaced items are reported in the stream statistics.
+
+    Setting ``max_buffer_bytes`` additionally bounds the buffer by the total size of the items in
+    it, as measured by ``item_size`` (:func:`len` by default). Once an item would take the total
+    over this budget, sending blocks until enough items have been received. An item larger than
+    the entire budget is still accepted when the buffer is empty, so that it can't block forever.
+
     :param max_buffer_size: number of items held in the buffer until ``send()`` starts blocking
     :param item_type: type of item, for marking the streams with the right generic type for
         static typing (not used at run time)
+    :param overflow_policy: one of ``block``, ``drop_oldest``, ``drop_newest`` or ``coalesce``
+    :param coalesce_key: a callable that returns the coalescing key for an item (required with
+        the ``coalesce`` policy)
+    :param max_buffer_bytes: total size of the items held in the buffer until ``send()`` starts
+        blocking (only supported with the ``block`` policy)
+    :param item_size: a callable that returns the size of an item, used with
+        ``max_buffer_bytes``
     :return: a tuple of (send stream, receive stream)
 
+    .. versionchanged:: 3.3
+        Added the ``overflow_policy``, ``coalesce_key``, ``max_buffer_bytes`` and ``item_size``
+        parameters.
+
     """
     if max_buffer_size != math.inf and not isinstance(max_buffer_size, int):
         raise ValueError('max_buffer_size must be either an integer or math.inf')
     if max_buffer_size < 0:
         raise ValueError('max_buffer_size cannot be negative')
+    if overflow_policy not in ('block', 'drop_oldest', 'drop_newest', 'coalesce'):
+        raise ValueError(f'invalid overflow policy: {overflow_policy!r}')
+    if overflow_policy != 'block' and not 1 <= max_buffer_size < math.inf:
+        raise ValueError(f'the {overflow_policy} policy requires a finite, nonzero '
+                         f'max_buffer_size')
+    if (overflow_policy == 'coalesce') != (coalesce_key is not None):
+        raise ValueError('coalesce_key must be given if and only if the overflow policy is '
+                         'coalesce')
+    if max_buffer_bytes != math.inf:
+        if not isinstance(max_buffer_bytes, int) or max_buffer_bytes < 1:
+            raise ValueError('max_buffer_bytes must be either a positive integer or math.inf')
+        if overflow_policy != 'block':
+            raise ValueError('max_buffer_bytes can only be used with the block overflow policy')
+        if item_size is None:
+            item_size = len  # type: ignore[assignment]
+    elif item_size is not None:
+        raise ValueError('item_size can only be used together with max_buffer_bytes')
 
-    state: MemoryObjectStreamState = MemoryObjectStreamState(max_buffer_size)
+    state: MemoryObjectStreamState = MemoryObjectStreamState(
+        max_buffer_size, overflow_policy, coalesce_key, max_buffer_bytes, item_size)
     return MemoryObjectSendStream(state), MemoryObjectReceiveStream(state)
+
+
+@overload
+def create_memory_object_broadcast_stream(
+    max_buffer_size: int, item_type: Type[T_Item], *,
+    slow_consumer_policy: SlowConsumerPolicy = 'block'
+) -> Tuple[MemoryObjectBroadcastSendStream[T_Item], MemoryObjectBroadcastReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_memory_object_broadcast_stream(
+    max_buffer_size: int, *, slow_consumer_policy: SlowConsumerPolicy = 'block'
+) -> Tuple[MemoryObjectBroadcastSendStream, MemoryObjectBroadcastReceiveStream]:
+    ...
+
+
+def create_memory_object_broadcast_stream(
+    max_buffer_size: int, item_type: Optional[Type[T_Item]] = None, *,
+    slow_consumer_policy: SlowConsumerPolicy = 'block'
+) -> Tuple[MemoryObjectBroadcastSendStream, MemoryObjectBroadcastReceiveStream]:
+    """
+    Create a broadcast memory object stream.
+
+    Unlike with :func:`create_memory_object_stream`, every subscriber (receive stream) gets every
+    item sent after it subscribed. New subscribers are created by cloning an existing one.
+
+    The slow consumer policy determines what happens when the buffer is full because one or more
+    subscribers have not received the oldest item yet:
+
+    * ``block``: ``send()`` blocks until the slowest subscriber catches up
+    * ``drop_oldest``: the lagging subscribers skip the oldest item
+    * ``disconnect``: the lagging subscribers are disconnected, and will get a
+      :exc:`~anyio.BrokenResourceError` on their next receive
+
+    :param max_buffer_size: number of items held in the shared buffer (must be at least 1)
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :param slow_consumer_policy: one of ``block``, ``drop_oldest`` or ``disconnect``
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionadded:: 3.3
+
+    """
+    if not isinstance(max_buffer_size, int):
+        raise ValueError('max_buffer_size must be an integer')
+    if max_buffer_size < 1:
+        raise ValueError('max_buffer_size must be at least 1')
+    if slow_consumer_policy not in ('block', 'drop_oldest', 'disconnect'):
+        raise ValueError(f'invalid slow consumer policy: {slow_consumer_policy!r}')
+
+    state: MemoryObjectBroadcastStreamState = MemoryObjectBroadcastStreamState(
+        max_buffer_size, slow_consumer_policy)
+    return MemoryObjectBroadcastSendStream(state), MemoryObjectBroadcastReceiveStream(state, 0)
+
+
+@overload
+def create_memory_object_partitioned_stream(
+    partitions: int, max_buffer_size: float, item_type: Type[T_Item], *,
+    key: Callable[[T_Item], Hashable]
+) -> Tuple[MemoryObjectPartitionedSendStream[T_Item], List[MemoryObjectReceiveStream[T_Item]]]:
+    ...
+
+
+@overload
+def create_memory_object_partitioned_stream(
+    partitions: int, max_buffer_size: float = 0, *, key: Callable[[T_Item], Hashable]
+) -> Tuple[MemoryObjectPartitionedSendStream, List[MemoryObjectReceiveStream]]:
+    ...
+
+
+def create_memory_object_partitioned_stream(
+    partitions: int, max_buffer_size: float = 0, item_type: Optional[Type[T_Item]] = None, *,
+    key: Callable[[T_Item], Hashable]
+) -> Tuple[MemoryObjectPartitionedSendStream, List[MemoryObjectReceiveStream]]:
+    """
+    Create a memory object stream which is partitioned by the key of each item.
+
+    Each sent item is routed by the hash of its key to one of the partitions, each of which has its
+    own buffer and receive stream. This allows the partitions to be consumed in parallel by
+    separate tasks while the items with the same key are still received in order.
+
+    :param partitions: number of partitions (must be at least 1)
+    :param max_buffer_size: number of items held in the buffer of each partition until sending
+        to that partition starts blocking
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :param key: a callable that returns the partitioning key for an item
+    :return: a tuple of (send stream, list of receive streams, one per partition)
+
+    .. versionadded:: 3.3
+
+    """
+    if not isinstance(partitions, int) or partitions < 1:
+        raise ValueError('partitions must be a positive integer')
+
+    send_streams: List[MemoryObjectSendStream] = []
+    receive_streams: List[MemoryObjectReceiveStream] = []
+    for _ in range(partitions):
+        send_stream, receive_stream = create_memory_object_stream(max_buffer_size)
+        send_streams.append(send_stream)
+        receive_streams.append(receive_stream)
+
+    return MemoryObjectPartitionedSendStream(send_streams, key), receive_streams
+
+
+@overload
+def create_memory_object_threadsafe_stream(
+    max_buffer_size: float, item_type: Type[T_Item]
+) -> Tuple[MemoryObjectThreadSafeSendStream[T_Item],
+           MemoryObjectThreadSafeReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_memory_object_threadsafe_stream(
+    max_buffer_size: float
+) -> Tuple[MemoryObjectThreadSafeSendStream, MemoryObjectThreadSafeReceiveStream]:
+    ...
+
+
+def create_memory_object_threadsafe_stream(
+    max_buffer_size: float, item_type: Optional[Type[T_Item]] = None
+) -> Tuple[MemoryObjectThreadSafeSendStream, MemoryObjectThreadSafeReceiveStream]:
+    """
+    Create a memory object stream whose sending end can be used from any thread.
+
+    The send stream can be used directly from worker threads (see
+    :meth:`~.streams.memory.MemoryObjectThreadSafeSendStream.send_blocking`) or from other event
+    loops, without a round trip to the receiving event loop for every item. A task waiting to
+    receive is only woken up once for a burst of sent items.
+
+    :param max_buffer_size: number of items held in the buffer until sending starts blocking
+        (must be at least 1)
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionadded:: 3.3
+
+    """
+    if max_buffer_size != math.inf and not isinstance(max_buffer_size, int):
+        raise ValueError('max_buffer_size must be either an integer or math.inf')
+    if max_buffer_size < 1:
+        raise ValueError('max_buffer_size must be at least 1')
+
+    state: MemoryObjectThreadSafeStreamState = MemoryObjectThreadSafeStreamState(max_buffer_size)
+    return MemoryObjectThreadSafeSendStream(state), MemoryObjectThreadSafeReceiveStream(state)
+
+
+@overload
+def create_memory_object_spilling_stream(
+    max_buffer_size: float, item_type: Type[T_Item], *, spill_batch_size: int = 100,
+    dumps: Callable[[T_Item], bytes] = ..., loads: Callable[[bytes], T_Item] = ...,
+    spill_dir: Optional[str] = None
+) -> Tuple[MemoryObjectSpillingSendStream[T_Item], MemoryObjectSpillingReceiveStream[T_Item]]:
+    ...
+
+
+@overload
+def create_memory_object_spilling_stream(
+    max_buffer_size: float, *, spill_batch_size: int = 100,
+    dumps: Callable[[Any], bytes] = ..., loads: Callable[[bytes], Any] = ...,
+    spill_dir: Optional[str] = None
+) -> Tuple[MemoryObjectSpillingSendStream, MemoryObjectSpillingReceiveStream]:
+    ...
+
+
+def create_memory_object_spilling_stream(
+    max_buffer_size: float, item_type: Optional[Type[T_Item]] = None, *,
+    spill_batch_size: int = 100,
+    dumps: Callable[[T_Item], bytes] = partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL),
+    loads: Callable[[bytes], T_Item] = pickle.loads, spill_dir: Optional[str] = None
+) -> Tuple[MemoryObjectSpillingSendStream, MemoryObjectSpillingReceiveStream]:
+    """
+    Create a memory object stream which spills items to disk when its buffer is full.
+
+    Up to ``max_buffer_size`` items are held in memory. After that, sent items are collected into
+    batches of ``spill_batch_size`` items, and each full batch is serialized and appended to a
+    temporary file in a worker thread. The items are read back from the file, in order, once the
+    receiving side has caught up. Sending only waits for the batch to be written to the file.
+
+    The spill file is created lazily, and deleted when all the receive streams have been closed.
+
+    :param max_buffer_size: number of items held in memory before spilling to disk (must be at
+        least 1)
+    :param item_type: type of item, for marking the streams with the right generic type for
+        static typing (not used at run time)
+    :param spill_batch_size: number of items written to the spill file at a time
+    :param dumps: a callable that serializes an item to bytes (defaults to pickling it)
+    :param loads: a callable that deserializes an item from bytes (defaults to unpickling it)
+    :param spill_dir: directory to create the spill file in (defaults to the system's temporary
+        directory)
+    :return: a tuple of (send stream, receive stream)
+
+    .. versionadded:: 3.3
+
+    """
+    if not isinstance(max_buffer_size, int) or max_buffer_size < 1:
+        raise ValueError('max_buffer_size must be a positive integer')
+    if not isinstance(spill_batch_size, int) or spill_batch_size < 1:
+        raise ValueError('spill_batch_size must be a positive integer')
+
+    state: MemoryObjectSpillingStreamState = MemoryObjectSpillingStreamState(
+        max_buffer_size, spill_batch_size, dumps, loads, spill_dir)
+    return MemoryObjectSpillingSendStream(state), MemoryObjectSpillingReceiveStream(state)
+
+
+def create_memory_byte_stream_pair(
+    max_buffer_bytes: float = 65536
+) -> Tuple[MemoryByteStream, MemoryByteStream]:
+    """
+    Create a pair of connected in-memory byte streams.
+
+    Data sent to either stream can be received from the other one. This is useful for connecting
+    protocol implementations to each other within a single process, and for testing or
+    benchmarking them without involving the operating system.
+
+    :param max_buffer_bytes: number of bytes buffered in each direction before sending starts
+        blocking
+    :return: a tuple of two byte streams connected to each other
+
+    .. versionadded:: 3.3
+
+    """
+    if max_buffer_bytes != math.inf and not isinstance(max_buffer_bytes, int):
+        raise ValueError('max_buffer_bytes must be either an integer or math.inf')
+    if max_buffer_bytes < 1:
+        raise ValueError('max_buffer_bytes must be at least 1')
+
+    pipe1 = MemoryBytePipe(max_buffer_bytes)
+    pipe2 = MemoryBytePipe(max_buffer_bytes)
+    return MemoryByteStream(pipe1, pipe2), MemoryByteStream(pipe2, pipe1)
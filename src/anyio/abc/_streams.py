@@ -132,6 +132,24 @@ class ByteReceiveStream(AsyncResource, TypedAttributeProvider):
         :raises ~anyio.EndOfStream: if this stream has been closed from the other end
         """
 
+    async def receive_into(self, buffer: Union[bytearray, memoryview]) -> int:
+        """
+        Receive at most ``len(buffer)`` bytes from the peer into the given buffer.
+
+        This allows the received data to be parsed from a preallocated buffer. The default
+        implementation calls :meth:`receive` and copies the data into the buffer, but subclasses
+        can override this to write the data to the buffer directly.
+
+        :param buffer: a writable buffer to receive the bytes into
+        :return: the number of bytes written to the buffer
+        :raises ~anyio.EndOfStream: if this stream has been closed from the other end
+
+        .. versionadded:: 3.3
+        """
+        data = await self.receive(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
 
 class ByteSendStream(AsyncResource, TypedAttributeProvider):
     """An interface for sending bytes to a single peer."""
@@ -1,8 +1,13 @@
+import re
 from dataclasses import dataclass, field
-from typing import Any, Callable, Mapping
+from typing import (
+    Any, AsyncIterator, Callable, Iterable, Mapping, NamedTuple, Optional, Union)
 
-from .. import ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead
-from ..abc import AnyByteReceiveStream, ByteReceiveStream
+from .. import (
+    BrokenResourceError, ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead, sleep)
+from ..abc import (
+    AnyByteReceiveStream, AnyByteSendStream, ByteReceiveStream, ByteSendStream, Lock, TaskGroup)
+from ..lowlevel import checkpoint_if_cancelled
 
 
 @dataclass(eq=False)
@@ -45,11 +50,32 @@ class BufferedByteReceiveStream(ByteReceiveStream):
             chunk = await self.receive_stream.receive()
             if len(chunk) > max_bytes:
                 # Save the surplus bytes in the buffer
-                self._buffer.extend(chunk[max_bytes:])
+                self._buffer += memoryview(chunk)[max_bytes:]
                 return chunk[:max_bytes]
             else:
                 return chunk
 
+    async def receive_into(self, buffer: Union[bytearray, memoryview]) -> int:
+        if self._closed:
+            raise ClosedResourceError
+
+        if self._buffer:
+            nbytes = min(len(buffer), len(self._buffer))
+            buffer[:nbytes] = self._buffer[:nbytes]
+            del self._buffer[:nbytes]
+            return nbytes
+        elif isinstance(self.receive_stream, ByteReceiveStream):
+            return await self.receive_stream.receive_into(buffer)
+        else:
+            # Copy as much of the received chunk as fits, and save the rest in the buffer
+            chunk = await self.receive_stream.receive()
+            nbytes = min(len(buffer), len(chunk))
+            buffer[:nbytes] = memoryview(chunk)[:nbytes]
+            if len(chunk) > nbytes:
+                self._buffer += memoryview(chunk)[nbytes:]
+
+            return nbytes
+
     async def receive_exactly(self, nbytes: int) -> bytes:
         """
         Read exactly the given amount of bytes from the stream.
@@ -114,3 +140,228 @@ class BufferedByteReceiveStream(ByteReceiveStream):
             # Move the offset forward and add the new data to the buffer
             offset = max(len(self._buffer) - delimiter_size + 1, 0)
             self._buffer.extend(data)
+
+    async def receive_until_any(self, delimiters: Iterable[bytes], max_bytes: int) -> bytes:
+        """
+        Read from the stream until any of the delimiters is found or max_bytes have been read.
+
+        The delimiter that occurs first in the stream wins. If several delimiters match at the same
+        position (like ``b'\\r\\n'`` and ``b'\\r'``), the longest one is consumed.
+
+        :param delimiters: the markers to look for in the stream
+        :param max_bytes: maximum number of bytes that will be read before raising
+            :exc:`~anyio.DelimiterNotFound`
+        :return: the bytes read (not including the delimiter)
+        :raises ~anyio.IncompleteRead: if the stream was closed before any of the delimiters
+            was found
+        :raises ~anyio.DelimiterNotFound: if none of the delimiters is found within the
+            bytes read up to the maximum allowed
+
+        .. versionadded:: 3.3
+
+        """
+        sorted_delimiters = sorted(delimiters, key=len, reverse=True)
+        if not sorted_delimiters or not sorted_delimiters[-1]:
+            raise ValueError('delimiters must be a non-empty collection of non-empty byte strings')
+
+        pattern = re.compile(b'|'.join(re.escape(delimiter) for delimiter in sorted_delimiters))
+        max_delimiter_size = len(sorted_delimiters[0])
+        offset = 0
+        while True:
+            match = pattern.search(self._buffer, offset)
+            if match:
+                found = self._buffer[:match.start()]
+                del self._buffer[:match.end()]
+                return bytes(found)
+
+            if len(self._buffer) >= max_bytes:
+                raise DelimiterNotFound(max_bytes)
+
+            try:
+                data = await self.receive_stream.receive()
+            except EndOfStream as exc:
+                raise IncompleteRead from exc
+
+            offset = max(len(self._buffer) - max_delimiter_size + 1, 0)
+            self._buffer.extend(data)
+
+    async def iter_until(self, delimiter: bytes, max_bytes: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Iterate over the records in the stream that are terminated by the given delimiter.
+
+        Unlike calling :meth:`receive_until` in a loop, every complete record already in the
+        buffer is yielded without going through the event loop, and more data is only received
+        from the wrapped stream when the buffer runs out of complete records.
+
+        The iteration ends when the stream is closed from the other end at a record boundary.
+
+        :param delimiter: the marker that terminates each record
+        :param max_bytes: maximum number of bytes that will be buffered while looking for the
+            delimiter before raising :exc:`~anyio.DelimiterNotFound`
+        :raises ~anyio.IncompleteRead: if the stream was closed in the middle of a record
+        :raises ~anyio.DelimiterNotFound: if the delimiter is not found within the maximum
+            allowed number of bytes
+
+        .. versionadded:: 3.3
+
+        """
+        if not delimiter:
+            raise ValueError('delimiter must not be empty')
+
+        delimiter_size = len(delimiter)
+        offset = 0
+        while True:
+            index = self._buffer.find(delimiter, offset)
+            if index >= 0:
+                record = bytes(self._buffer[:index])
+                del self._buffer[:index + delimiter_size]
+                offset = 0
+                yield record
+                continue
+
+            if len(self._buffer) >= max_bytes:
+                raise DelimiterNotFound(max_bytes)
+
+            try:
+                data = await self.receive_stream.receive()
+            except EndOfStream:
+                if self._buffer:
+                    raise IncompleteRead from None
+
+                return
+
+            # Only the tail of the buffer can contain the start of a delimiter
+            offset = max(len(self._buffer) - delimiter_size + 1, 0)
+            self._buffer.extend(data)
+
+    async def iter_lines(self, max_bytes: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Iterate over the lines in the stream, using :meth:`iter_until`.
+
+        Lines are terminated by ``b'\\n'``, and a ``b'\\r'`` preceding the line feed is removed
+        too. The line terminators are not included in the yielded lines.
+
+        :param max_bytes: maximum number of bytes that will be buffered while looking for the end
+            of a line before raising :exc:`~anyio.DelimiterNotFound`
+
+        .. versionadded:: 3.3
+
+        """
+        async for line in self.iter_until(b'\n', max_bytes):
+            yield line[:-1] if line.endswith(b'\r') else line
+
+
+class BufferedByteSendStreamStatistics(NamedTuple):
+    #: number of bytes currently waiting to be flushed
+    current_buffer_used: int
+    #: number of writes made to the wrapped stream
+    flush_count: int
+    #: total number of bytes written to the wrapped stream
+    bytes_flushed: int
+
+    @property
+    def average_flush_size(self) -> float:
+        """The average number of bytes written to the wrapped stream per write."""
+        return self.bytes_flushed / self.flush_count if self.flush_count else 0.0
+
+
+@dataclass(eq=False)
+class BufferedByteSendStream(ByteSendStream):
+    """
+    Wraps any bytes-based send stream and combines small writes into larger ones.
+
+    Sent bytes are collected into a buffer which is written to the wrapped stream when it reaches
+    ``max_buffer_size`` bytes, when :meth:`flush` is called and when the stream is closed.
+    Sending to a stream that doesn't need to be flushed only checks for cancellation, without
+    yielding to the event loop.
+
+    If ``flush_delay`` is given, the buffer is also flushed in a background task (spawned in
+    ``task_group``) once that many seconds have passed since data was first added to the empty
+    buffer.
+
+    :param send_stream: any bytes-based send stream
+    :param max_buffer_size: number of buffered bytes which triggers a flush
+    :param flush_delay: maximum time (in seconds) to keep data in the buffer before flushing it
+    :param task_group: task group used to run delayed flushes (required with ``flush_delay``)
+
+    .. versionadded:: 3.3
+    """
+
+    send_stream: AnyByteSendStream
+    max_buffer_size: int = 65536
+    flush_delay: Optional[float] = None
+    task_group: Optional[TaskGroup] = None
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
+    _lock: Lock = field(init=False, default_factory=Lock)
+    _flush_scheduled: bool = field(init=False, default=False)
+    _flush_count: int = field(init=False, default=0)
+    _bytes_flushed: int = field(init=False, default=0)
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        if self.max_buffer_size < 1:
+            raise ValueError('max_buffer_size must be at least 1')
+        if self.flush_delay is not None and self.task_group is None:
+            raise ValueError('task_group is required when flush_delay is set')
+
+    async def send(self, item: bytes) -> None:
+        if self._closed:
+            raise ClosedResourceError
+
+        if not self._buffer and len(item) >= self.max_buffer_size:
+            # Don't bother copying a large item to the buffer
+            await self._write(item)
+            return
+
+        self._buffer += item
+        if len(self._buffer) >= self.max_buffer_size:
+            await self.flush()
+        else:
+            if not self._flush_scheduled and self.task_group is not None:
+                self._flush_scheduled = True
+                self.task_group.start_soon(self._delayed_flush)
+
+            await checkpoint_if_cancelled()
+
+    async def _write(self, data: Union[bytes, bytearray]) -> None:
+        async with self._lock:
+            await self.send_stream.send(data)
+
+        self._flush_count += 1
+        self._bytes_flushed += len(data)
+
+    async def _delayed_flush(self) -> None:
+        assert self.flush_delay is not None
+        await sleep(self.flush_delay)
+        self._flush_scheduled = False
+        if not self._closed:
+            try:
+                await self.flush()
+            except (BrokenResourceError, ClosedResourceError):
+                # The next send or flush will raise an exception too
+                pass
+
+    async def flush(self) -> None:
+        """Write all the buffered bytes to the wrapped stream."""
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._write(data)
+
+    async def aclose(self) -> None:
+        """Flush any buffered bytes and close the wrapped stream."""
+        if not self._closed:
+            try:
+                await self.flush()
+            finally:
+                self._closed = True
+                await self.send_stream.aclose()
+
+    def statistics(self) -> BufferedByteSendStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return BufferedByteSendStreamStatistics(len(self._buffer), self._flush_count,
+                                                self._bytes_flushed)
+
+    @property
+    def extra_attributes(self) -> Mapping[Any, Callable[[], Any]]:
+        return self.send_stream.extra_attributes
@@ -0,0 +1,238 @@
+import struct
+import sys
+from dataclasses import InitVar, dataclass, field
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple
+
+from .. import BrokenResourceError, EndOfStream, IncompleteRead
+from .._core._synchronization import ResourceGuard
+from ..abc import AnyByteStream, ObjectStream
+
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
+HeaderFormat = Literal['u16', 'u32', 'varint']
+
+_struct_formats = {'u16': 'H', 'u32': 'I'}
+
+#: payloads at least this large are sent separately from their headers instead of being copied
+#: into a new bytes object along with the header
+_VECTORED_SEND_THRESHOLD = 16384
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _decode_varint(buffer: bytearray) -> Optional[Tuple[int, int]]:
+    # Return the decoded value and its size, or None if the buffer doesn't contain all of it
+    value = shift = 0
+    for index, byte in enumerate(buffer[:10]):
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, index + 1
+
+        shift += 7
+
+    if len(buffer) >= 10:
+        raise ValueError('malformed varint')
+
+    return None
+
+
+@dataclass(eq=False)
+class FramedByteStream(ObjectStream[bytes]):
+    """
+    Sends and receives length-prefixed frames (messages) over a byte stream.
+
+    Each frame is preceded by a header which contains the length of the payload, as either an
+    unsigned 16 or 32 bit integer or as an unsigned LEB128 variable length integer (as used by
+    Protocol Buffers).
+
+    Receiving a frame that is larger than ``max_frame_size`` raises
+    :exc:`~anyio.BrokenResourceError`, as does any further attempt to receive from the stream, as
+    the framing cannot be recovered after that.
+
+    :param transport_stream: any bytes-based stream
+    :param header_format: ``u16``, ``u32`` or ``varint``
+    :param byteorder: ``big`` or ``little`` (not used with ``varint`` headers)
+    :param max_frame_size: maximum size of a frame payload, in bytes
+
+    .. versionadded:: 3.3
+    """
+
+    transport_stream: AnyByteStream
+    header_format: InitVar[HeaderFormat] = 'u32'
+    byteorder: InitVar[Literal['big', 'little']] = 'big'
+    max_frame_size: int = 16 * 1024 * 1024
+    _header: Optional[struct.Struct] = field(init=False)
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
+    _broken: bool = field(init=False, default=False)
+    _receive_guard: ResourceGuard = field(init=False)
+    _send_guard: ResourceGuard = field(init=False)
+
+    def __post_init__(self, header_format: HeaderFormat, byteorder: str) -> None:
+        if header_format == 'varint':
+            self._header = None
+        elif header_format in _struct_formats:
+            if byteorder not in ('big', 'little'):
+                raise ValueError(f'invalid byte order: {byteorder!r}')
+
+            prefix = '>' if byteorder == 'big' else '<'
+            self._header = struct.Struct(prefix + _struct_formats[header_format])
+            self.max_frame_size = min(self.max_frame_size, 256 ** self._header.size - 1)
+        else:
+            raise ValueError(f'invalid header format: {header_format!r}')
+
+        self._receive_guard = ResourceGuard('reading from')
+        self._send_guard = ResourceGuard('writing to')
+
+    def _encode_header(self, size: int) -> bytes:
+        if size > self.max_frame_size:
+            raise ValueError(f'the frame is too large ({size} > {self.max_frame_size} bytes)')
+
+        if self._header is None:
+            return _encode_varint(size)
+        else:
+            return self._header.pack(size)
+
+    def _next_frame(self) -> Optional[bytes]:
+        # Return the next complete frame from the buffer, or None if there isn't one
+        buffer = self._buffer
+        if self._header is None:
+            try:
+                decoded = _decode_varint(buffer)
+            except ValueError:
+                self._broken = True
+                raise BrokenResourceError('received a malformed frame header') from None
+
+            if decoded is None:
+                return None
+
+            size, header_size = decoded
+        elif len(buffer) < self._header.size:
+            return None
+        else:
+            size = self._header.unpack_from(buffer)[0]
+            header_size = self._header.size
+
+        if size > self.max_frame_size:
+            self._broken = True
+            raise BrokenResourceError(f'received a frame that is too large ({size} > '
+                                      f'{self.max_frame_size} bytes)')
+
+        end = header_size + size
+        if len(buffer) < end:
+            return None
+
+        frame = bytes(buffer[header_size:end])
+        del buffer[:end]
+        return frame
+
+    async def _receive_more(self) -> None:
+        try:
+            data = await self.transport_stream.receive()
+        except EndOfStream:
+            if self._buffer:
+                raise IncompleteRead from None
+
+            raise
+
+        self._buffer += data
+
+    async def receive(self) -> bytes:
+        with self._receive_guard:
+            if self._broken:
+                raise BrokenResourceError
+
+            while True:
+                frame = self._next_frame()
+                if frame is not None:
+                    return frame
+
+                await self._receive_more()
+
+    async def receive_batch(self, max_frames: Optional[int] = None) -> List[bytes]:
+        """
+        Receive at least one frame, along with any further complete frames already received.
+
+        :param max_frames: maximum number of frames to return (``None`` for no limit)
+        :return: a non-empty list of frames
+        :raises ~anyio.EndOfStream: if the stream was closed from the other end at a frame
+            boundary
+        :raises ~anyio.IncompleteRead: if the stream was closed from the other end in the middle
+            of a frame
+
+        """
+        if max_frames is not None and max_frames < 1:
+            raise ValueError('max_frames must be at least 1')
+
+        frames = [await self.receive()]
+        with self._receive_guard:
+            while max_frames is None or len(frames) < max_frames:
+                try:
+                    frame = self._next_frame()
+                except BrokenResourceError:
+                    # Return the good frames now; the next receive will raise the exception
+                    break
+
+                if frame is None:
+                    break
+
+                frames.append(frame)
+
+        return frames
+
+    async def send(self, item: bytes) -> None:
+        """
+        Send the given bytes as a single frame.
+
+        :param item: the frame payload
+        :raises ValueError: if the payload is larger than ``max_frame_size``
+
+        """
+        header = self._encode_header(len(item))
+        with self._send_guard:
+            if len(item) < _VECTORED_SEND_THRESHOLD:
+                await self.transport_stream.send(header + item)
+            else:
+                # Avoid copying a large payload just to prepend the header to it
+                await self.transport_stream.send(header)
+                await self.transport_stream.send(item)
+
+    async def send_many(self, items: Iterable[bytes]) -> None:
+        """
+        Send each of the given byte strings as a separate frame.
+
+        The frames are combined into as few writes to the transport stream as possible.
+
+        :param items: the frame payloads
+        :raises ValueError: if any of the payloads is larger than ``max_frame_size`` (in which
+            case nothing is sent)
+
+        """
+        parts: List[bytes] = []
+        for item in items:
+            parts.append(self._encode_header(len(item)))
+            parts.append(item)
+
+        if parts:
+            with self._send_guard:
+                await self.transport_stream.send(b''.join(parts))
+
+    async def send_eof(self) -> None:
+        await self.transport_stream.send_eof()
+
+    async def aclose(self) -> None:
+        await self.transport_stream.aclose()
+
+    @property
+    def extra_attributes(self) -> Mapping[Any, Callable[[], Any]]:
+        return self.transport_stream.extra_attributes
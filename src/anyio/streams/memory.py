@@ -1,15 +1,35 @@
+import math
+import struct
+import sys
+import tempfile
+import threading
+import time
 from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from types import TracebackType
-from typing import Deque, Generic, List, NamedTuple, Optional, Type, TypeVar
+from typing import (
+    Any, AsyncIterator, Callable, Deque, Dict, Generic, Hashable, Iterable, List, NamedTuple,
+    Optional, Sequence, Set, Tuple, Type, TypeVar, Union)
 
 from .. import (
-    BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock, get_cancelled_exc_class)
+    BrokenResourceError, ClosedResourceError, EndOfStream, WouldBlock, get_cancelled_exc_class,
+    to_thread)
 from .._core._compat import DeprecatedAwaitable
-from ..abc import Event, ObjectReceiveStream, ObjectSendStream
+from .._core._eventloop import get_asynclib
+from .._core._synchronization import ResourceGuard
+from ..abc import ByteStream, Event, Lock, ObjectReceiveStream, ObjectSendStream
 from ..lowlevel import checkpoint
 
+if sys.version_info >= (3, 8):
+    from typing import Literal
+else:
+    from typing_extensions import Literal
+
 T_Item = TypeVar('T_Item')
+OverflowPolicy = Literal['block', 'drop_oldest', 'drop_newest', 'coalesce']
+SlowConsumerPolicy = Literal['block', 'drop_oldest', 'disconnect']
+
+_spill_record_length = struct.Struct('<I')
 
 
 class MemoryObjectStreamStatistics(NamedTuple):
@@ -19,22 +39,131 @@ class MemoryObjectStreamStatistics(NamedTuple):
     open_receive_streams: int
     tasks_waiting_send: int
     tasks_waiting_receive: int
+    #: number of items discarded due to the overflow policy
+    items_dropped: int
+    #: number of items that replaced an earlier item with the same key in the buffer
+    items_coalesced: int
+    #: total size of the items in the buffer (only tracked when a byte budget has been set)
+    current_buffer_bytes: int
+    #: the byte budget of the buffer
+    max_buffer_bytes: float
+
+
+class MemoryObjectItemReceiver(Generic[T_Item]):
+    """
+    Holds the item handed over to a task waiting to receive.
+
+    The ``item`` slot is left unset until an item has been delivered, so that any value
+    (including ``None``) can be passed through without allocating a separate container.
+    """
+
+    __slots__ = 'item',
+
+    item: T_Item
+
+    @property
+    def has_item(self) -> bool:
+        return hasattr(self, 'item')
 
 
 @dataclass(eq=False)
 class MemoryObjectStreamState(Generic[T_Item]):
     max_buffer_size: float = field()
-    buffer: Deque[T_Item] = field(init=False, default_factory=deque)
+    overflow_policy: OverflowPolicy = 'block'
+    coalesce_key: Optional[Callable[[T_Item], Hashable]] = None
+    max_buffer_bytes: float = math.inf
+    #: returns the size of an item; only set when the buffer has a byte budget
+    item_size: Optional[Callable[[T_Item], int]] = None
+    #: with the ``coalesce`` policy, this holds keys which map to items in ``coalesced_items``
+    buffer: Deque[Any] = field(init=False, default_factory=deque)
+    coalesced_items: Dict[Hashable, T_Item] = field(init=False, default_factory=dict)
+    #: sizes of the items in the buffer, in the same order (only used with a byte budget)
+    item_sizes: Deque[int] = field(init=False, default_factory=deque)
+    buffer_bytes: int = field(init=False, default=0)
+    items_dropped: int = field(init=False, default=0)
+    items_coalesced: int = field(init=False, default=0)
     open_send_channels: int = field(init=False, default=0)
     open_receive_channels: int = field(init=False, default=0)
-    waiting_receivers: 'OrderedDict[Event, List[T_Item]]' = field(init=False,
-                                                                  default_factory=OrderedDict)
+    waiting_receivers: 'OrderedDict[Event, MemoryObjectItemReceiver[T_Item]]' = field(
+        init=False, default_factory=OrderedDict)
     waiting_senders: 'OrderedDict[Event, T_Item]' = field(init=False, default_factory=OrderedDict)
 
+    def __post_init__(self) -> None:
+        if self.overflow_policy != 'block':
+            # Use a fixed size ring buffer which automatically discards the oldest item
+            self.buffer = deque(maxlen=int(self.max_buffer_size))
+
+    def put_sized(self, item: T_Item) -> bool:
+        """
+        Add an item to the buffer if it fits within both the item limit and the byte budget.
+
+        An item is always accepted into an empty buffer, even if it alone exceeds the byte budget.
+
+        :return: ``True`` if the item was added, ``False`` if there was no room for it
+
+        """
+        assert self.item_size is not None
+        if len(self.buffer) >= self.max_buffer_size:
+            return False
+
+        size = self.item_size(item)
+        if self.buffer and self.buffer_bytes + size > self.max_buffer_bytes:
+            return False
+
+        self.buffer.append(item)
+        self.item_sizes.append(size)
+        self.buffer_bytes += size
+        return True
+
+    def popleft_sized(self) -> T_Item:
+        self.buffer_bytes -= self.item_sizes.popleft()
+        return self.buffer.popleft()
+
+    def fill_from_senders(self) -> None:
+        """Move items from waiting senders to the buffer for as long as there's room for them."""
+        waiting_senders = self.waiting_senders
+        if self.item_size is not None:
+            while waiting_senders:
+                send_event, item = next(iter(waiting_senders.items()))
+                if not self.put_sized(item):
+                    break
+
+                del waiting_senders[send_event]
+                send_event.set()
+        else:
+            while waiting_senders and len(self.buffer) < self.max_buffer_size:
+                send_event, item = waiting_senders.popitem(last=False)
+                self.buffer.append(item)
+                send_event.set()
+
+    def put_overflowing(self, item: T_Item) -> None:
+        """Add an item to the buffer according to a non-blocking overflow policy."""
+        if self.coalesce_key is not None:
+            key = self.coalesce_key(item)
+            if key in self.coalesced_items:
+                self.coalesced_items[key] = item
+                self.items_coalesced += 1
+                return
+
+            if len(self.buffer) == self.buffer.maxlen:
+                del self.coalesced_items[self.buffer.popleft()]
+                self.items_dropped += 1
+
+            self.buffer.append(key)
+            self.coalesced_items[key] = item
+        elif len(self.buffer) < self.max_buffer_size:
+            self.buffer.append(item)
+        elif self.overflow_policy == 'drop_oldest':
+            self.buffer.append(item)
+            self.items_dropped += 1
+        else:
+            self.items_dropped += 1
+
     def statistics(self) -> MemoryObjectStreamStatistics:
         return MemoryObjectStreamStatistics(
             len(self.buffer), self.max_buffer_size, self.open_send_channels,
-            self.open_receive_channels, len(self.waiting_senders), len(self.waiting_receivers))
+            self.open_receive_channels, len(self.waiting_senders), len(self.waiting_receivers),
+            self.items_dropped, self.items_coalesced, self.buffer_bytes, self.max_buffer_bytes)
 
 
 @dataclass(eq=False)
@@ -60,6 +189,9 @@ class MemoryObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
         if self._closed:
             raise ClosedResourceError
 
+        if self._state.item_size is not None:
+            return self._receive_nowait_sized()
+
         if self._state.waiting_senders:
             # Get the item from the next sender
             send_event, item = self._state.waiting_senders.popitem(last=False)
@@ -67,36 +199,162 @@ class MemoryObjectReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
             send_event.set()
 
         if self._state.buffer:
+            if self._state.coalesce_key is not None:
+                return self._state.coalesced_items.pop(self._state.buffer.popleft())
+
             return self._state.buffer.popleft()
         elif not self._state.open_send_channels:
             raise EndOfStream
 
         raise WouldBlock
 
+    def _receive_nowait_sized(self) -> T_Item:
+        state = self._state
+        if state.buffer:
+            item = state.popleft_sized()
+        elif state.waiting_senders:
+            send_event, item = state.waiting_senders.popitem(last=False)
+            send_event.set()
+            return item
+        elif not state.open_send_channels:
+            raise EndOfStream
+        else:
+            raise WouldBlock
+
+        # Move as many items from waiting senders to the buffer as now fit in it
+        state.fill_from_senders()
+        return item
+
+    def receive_nowait_batch(self, max_items: Optional[int] = None) -> List[T_Item]:
+        """
+        Receive all the items that can be received without waiting, up to the given limit.
+
+        Items are taken first from the buffer and then from any tasks waiting to send, in the
+        order in which they were sent.
+
+        :param max_items: maximum number of items to receive (``None`` for no limit)
+        :return: a non-empty list of received items
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no items in the buffer and no tasks
+            waiting to send
+
+        .. versionadded:: 3.3
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if max_items is not None and max_items < 1:
+            raise ValueError('max_items must be at least 1')
+
+        state = self._state
+        buffer = state.buffer
+        if max_items is None or max_items >= len(buffer):
+            items = list(buffer)
+            buffer.clear()
+            state.item_sizes.clear()
+            state.buffer_bytes = 0
+        elif state.item_size is not None:
+            items = [state.popleft_sized() for _ in range(max_items)]
+        else:
+            items = [buffer.popleft() for _ in range(max_items)]
+
+        if state.coalesce_key is not None:
+            items = [state.coalesced_items.pop(key) for key in items]
+
+        # Take the rest from the waiting senders, then refill the freed buffer space from them
+        waiting_senders = state.waiting_senders
+        while waiting_senders and (max_items is None or len(items) < max_items):
+            send_event, item = waiting_senders.popitem(last=False)
+            items.append(item)
+            send_event.set()
+
+        state.fill_from_senders()
+
+        if items:
+            return items
+        elif not state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    async def receive_batch(self, max_items: Optional[int] = None) -> List[T_Item]:
+        """
+        Receive at least one item, along with any further items available without waiting.
+
+        This is more efficient than calling :meth:`receive` repeatedly, as only a single
+        checkpoint is made for the entire batch.
+
+        :param max_items: maximum number of items to receive (``None`` for no limit)
+        :return: a non-empty list of received items
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+
+        .. versionadded:: 3.3
+
+        """
+        await checkpoint()
+        try:
+            return self.receive_nowait_batch(max_items)
+        except WouldBlock:
+            items = [await self._wait_receive()]
+
+        if max_items is None or max_items > 1:
+            try:
+                items.extend(self.receive_nowait_batch(None if max_items is None
+                                                       else max_items - 1))
+            except (WouldBlock, EndOfStream):
+                pass
+
+        return items
+
+    async def iter_batches(self, max_items: Optional[int] = None) -> AsyncIterator[List[T_Item]]:
+        """
+        Iterate over the received items in batches, using :meth:`receive_batch`.
+
+        The iteration ends when all the send streams have been closed and the buffer has been
+        exhausted.
+
+        :param max_items: maximum number of items in each batch (``None`` for no limit)
+
+        .. versionadded:: 3.3
+
+        """
+        while True:
+            try:
+                yield await self.receive_batch(max_items)
+            except EndOfStream:
+                return
+
     async def receive(self) -> T_Item:
         await checkpoint()
         try:
             return self.receive_nowait()
         except WouldBlock:
-            # Add ourselves in the queue
-            receive_event = Event()
-            container: List[T_Item] = []
-            self._state.waiting_receivers[receive_event] = container
+            return await self._wait_receive()
 
-            try:
-                await receive_event.wait()
-            except get_cancelled_exc_class():
-                # Ignore the immediate cancellation if we already received an item, so as not to
-                # lose it
-                if not container:
-                    raise
-            finally:
-                self._state.waiting_receivers.pop(receive_event, None)
+    async def _wait_receive(self) -> T_Item:
+        # Add ourselves in the queue
+        receive_event = Event()
+        receiver: MemoryObjectItemReceiver[T_Item] = MemoryObjectItemReceiver()
+        self._state.waiting_receivers[receive_event] = receiver
 
-            if container:
-                return container[0]
-            else:
-                raise EndOfStream
+        try:
+            await receive_event.wait()
+        except get_cancelled_exc_class():
+            # Ignore the immediate cancellation if we already received an item, so as not to
+            # lose it
+            if not receiver.has_item:
+                raise
+        finally:
+            self._state.waiting_receivers.pop(receive_event, None)
+
+        if receiver.has_item:
+            return receiver.item
+        else:
+            raise EndOfStream
 
     def clone(self) -> 'MemoryObjectReceiveStream':
         """
@@ -165,8 +423,8 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
         :raises ~anyio.ClosedResourceError: if this send stream has been closed
         :raises ~anyio.BrokenResourceError: if the stream has been closed from the
             receiving end
-        :raises ~anyio.WouldBlock: if the buffer is full and there are no tasks waiting
-            to receive
+        :raises ~anyio.WouldBlock: if the buffer is full, there are no tasks waiting
+            to receive and the overflow policy is ``block``
 
         """
         if self._closed:
@@ -175,9 +433,15 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
             raise BrokenResourceError
 
         if self._state.waiting_receivers:
-            receive_event, container = self._state.waiting_receivers.popitem(last=False)
-            container.append(item)
+            receive_event, receiver = self._state.waiting_receivers.popitem(last=False)
+            receiver.item = item
             receive_event.set()
+        elif self._state.overflow_policy != 'block':
+            self._state.put_overflowing(item)
+        elif self._state.item_size is not None:
+            # Don't let smaller items overtake a waiting sender whose item doesn't fit yet
+            if self._state.waiting_senders or not self._state.put_sized(item):
+                raise WouldBlock
         elif len(self._state.buffer) < self._state.max_buffer_size:
             self._state.buffer.append(item)
         else:
@@ -202,6 +466,31 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
             if self._state.waiting_senders.pop(send_event, None):  # type: ignore[arg-type]
                 raise BrokenResourceError
 
+    async def send_many(self, items: Iterable[T_Item]) -> None:
+        """
+        Send all the given items, in order.
+
+        Items are handed directly to any waiting receivers and then placed into the buffer as long
+        as there is room in it. Only when the buffer fills up will this method wait for receivers,
+        so in the common case only a single checkpoint is made for the entire batch.
+
+        If the operation is cancelled, some of the items may already have been sent.
+
+        :param items: the items to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+
+        .. versionadded:: 3.3
+
+        """
+        await checkpoint()
+        for item in items:
+            try:
+                self.send_nowait(item)
+            except WouldBlock:
+                await self.send(item)
+
     def clone(self) -> 'MemoryObjectSendStream':
         """
         Create a clone of this send stream.
@@ -252,3 +541,1358 @@ class MemoryObjectSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
                  exc_val: Optional[BaseException],
                  exc_tb: Optional[TracebackType]) -> None:
         self.close()
+
+
+
+@dataclass(eq=False)
+class MemoryObjectPartitionedSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    """
+    Routes each sent item to one of several partitions, based on the hash of the item's key.
+
+    Every partition is a separate memory object stream with its own buffer and receive stream, so
+    items with the same key are always received in the order they were sent. Sending only blocks
+    when the buffer of the item's own partition is full.
+
+    .. versionadded:: 3.3
+    """
+
+    _streams: List[MemoryObjectSendStream[T_Item]]
+    _key: Callable[[T_Item], Hashable]
+    _closed: bool = field(init=False, default=False)
+
+    def partition_for(self, item: T_Item) -> int:
+        """
+        Return the index of the partition the given item would be sent to.
+
+        :param item: an item
+        :return: the partition index
+
+        """
+        return hash(self._key(item)) % len(self._streams)
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Send an item to its partition immediately if it can be done without waiting.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the partition has been closed from the
+            receiving end
+        :raises ~anyio.WouldBlock: if the buffer of the partition is full and there are no tasks
+            waiting to receive from it
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        self._streams[hash(self._key(item)) % len(self._streams)].send_nowait(item)
+
+    async def send(self, item: T_Item) -> None:
+        if self._closed:
+            raise ClosedResourceError
+
+        await self._streams[hash(self._key(item)) % len(self._streams)].send(item)
+
+    async def send_many(self, items: Iterable[T_Item]) -> None:
+        """
+        Send all the given items, in order, to their respective partitions.
+
+        In the common case, only a single checkpoint is made for the entire batch.
+
+        :param items: the items to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if a partition has been closed from the
+            receiving end
+
+        """
+        await checkpoint()
+        for item in items:
+            try:
+                self.send_nowait(item)
+            except WouldBlock:
+                await self.send(item)
+
+    def clone(self) -> 'MemoryObjectPartitionedSendStream[T_Item]':
+        """
+        Create a clone of this send stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        sending end of the partitions be considered closed by the receiving ends.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectPartitionedSendStream([stream.clone() for stream in self._streams],
+                                                 self._key)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        if not self._closed:
+            self._closed = True
+            for stream in self._streams:
+                stream.close()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> Tuple[MemoryObjectStreamStatistics, ...]:
+        """Return statistics about the current state of each partition."""
+        return tuple(stream.statistics() for stream in self._streams)
+
+    def __enter__(self) -> 'MemoryObjectPartitionedSendStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+class MemoryObjectBroadcastStreamStatistics(NamedTuple):
+    current_buffer_used: int
+    max_buffer_size: int
+    open_send_streams: int
+    open_receive_streams: int
+    tasks_waiting_send: int
+    tasks_waiting_receive: int
+    items_dropped: int
+    #: number of unread items for each open subscriber, in the order of subscription
+    subscriber_lags: Tuple[int, ...]
+
+
+@dataclass(eq=False)
+class MemoryObjectBroadcastStreamState(Generic[T_Item]):
+    max_buffer_size: int
+    slow_consumer_policy: SlowConsumerPolicy = 'block'
+    #: ring buffer where the item with sequence number ``n`` lives at ``n % max_buffer_size``
+    buffer: List[Any] = field(init=False)
+    #: sequence number of the next item to be sent
+    head: int = field(init=False, default=0)
+    #: sequence number of the oldest item not yet received by all subscribers
+    tail: int = field(init=False, default=0)
+    items_dropped: int = field(init=False, default=0)
+    open_send_channels: int = field(init=False, default=0)
+    subscribers: 'List[MemoryObjectBroadcastReceiveStream[T_Item]]' = field(
+        init=False, default_factory=list)
+    waiting_receivers: Set[Event] = field(init=False, default_factory=set)
+    waiting_senders: Set[Event] = field(init=False, default_factory=set)
+
+    def __post_init__(self) -> None:
+        self.buffer = [None] * self.max_buffer_size
+
+    def advance_tail(self) -> None:
+        """Release the items that have been received by every subscriber."""
+        if self.subscribers:
+            new_tail = min(subscriber._cursor for subscriber in self.subscribers)
+        else:
+            new_tail = self.head
+
+        if new_tail > self.tail:
+            for seq in range(self.tail, new_tail):
+                self.buffer[seq % self.max_buffer_size] = None
+
+            self.tail = new_tail
+            self.wake_senders()
+
+    def wake_senders(self) -> None:
+        events = list(self.waiting_senders)
+        self.waiting_senders.clear()
+        for event in events:
+            event.set()
+
+    def wake_receivers(self) -> None:
+        events = list(self.waiting_receivers)
+        self.waiting_receivers.clear()
+        for event in events:
+            event.set()
+
+    def statistics(self) -> MemoryObjectBroadcastStreamStatistics:
+        return MemoryObjectBroadcastStreamStatistics(
+            self.head - self.tail, self.max_buffer_size, self.open_send_channels,
+            len(self.subscribers), len(self.waiting_senders), len(self.waiting_receivers),
+            self.items_dropped,
+            tuple(self.head - subscriber._cursor for subscriber in self.subscribers))
+
+
+@dataclass(eq=False)
+class MemoryObjectBroadcastReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
+    """
+    A subscriber to a broadcast memory object stream.
+
+    Every subscriber receives every item sent after it subscribed.
+    """
+
+    _state: MemoryObjectBroadcastStreamState[T_Item]
+    _cursor: int
+    _closed: bool = field(init=False, default=False)
+    _disconnected: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self._state.subscribers.append(self)
+
+    def receive_nowait(self) -> T_Item:
+        """
+        Receive the next item if it can be done without waiting.
+
+        :return: the received item
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.BrokenResourceError: if this subscriber was disconnected for falling too
+            far behind
+        :raises ~anyio.EndOfStream: if this subscriber has received all the items and the
+            stream has been closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no new items for this subscriber
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if self._disconnected:
+            raise BrokenResourceError
+
+        state = self._state
+        cursor = self._cursor
+        if cursor < state.head:
+            item = state.buffer[cursor % state.max_buffer_size]
+            self._cursor = cursor + 1
+            if cursor == state.tail:
+                state.advance_tail()
+
+            return item
+        elif not state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    async def receive(self) -> T_Item:
+        await checkpoint()
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                receive_event = Event()
+                self._state.waiting_receivers.add(receive_event)
+                try:
+                    await receive_event.wait()
+                finally:
+                    self._state.waiting_receivers.discard(receive_event)
+
+    def clone(self) -> 'MemoryObjectBroadcastReceiveStream[T_Item]':
+        """
+        Create a new subscriber, starting from the same position as this one.
+
+        :return: the new subscriber
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if self._disconnected:
+            raise BrokenResourceError
+
+        return MemoryObjectBroadcastReceiveStream(self._state, self._cursor)
+
+    def _disconnect(self) -> None:
+        self._disconnected = True
+        self._state.subscribers.remove(self)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        if not self._closed:
+            self._closed = True
+            if not self._disconnected:
+                self._state.subscribers.remove(self)
+                self._state.advance_tail()
+                if not self._state.subscribers:
+                    self._state.wake_senders()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectBroadcastStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectBroadcastReceiveStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+@dataclass(eq=False)
+class MemoryObjectBroadcastSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    """
+    The sending end of a broadcast memory object stream.
+
+    Items are stored only once, in a ring buffer shared by all the subscribers.
+    """
+
+    _state: MemoryObjectBroadcastStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self._state.open_send_channels += 1
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Send an item immediately if it can be done without waiting.
+
+        If the buffer is full, the outcome depends on the slow consumer policy. With ``block``,
+        :exc:`~anyio.WouldBlock` is raised. With ``drop_oldest``, the subscribers that have not
+        yet received the oldest item will skip it. With ``disconnect``, those subscribers are
+        disconnected, and will raise :exc:`~anyio.BrokenResourceError` on their next receive.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if there are no subscribers left
+        :raises ~anyio.WouldBlock: if the buffer is full and the slow consumer policy is
+            ``block``
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        state = self._state
+        if not state.subscribers:
+            raise BrokenResourceError
+
+        if state.head - state.tail >= state.max_buffer_size:
+            if state.slow_consumer_policy == 'block':
+                raise WouldBlock
+
+            for subscriber in list(state.subscribers):
+                if subscriber._cursor == state.tail:
+                    if state.slow_consumer_policy == 'drop_oldest':
+                        subscriber._cursor += 1
+                        state.items_dropped += 1
+                    else:
+                        subscriber._disconnect()
+
+            if not state.subscribers:
+                raise BrokenResourceError
+
+            state.advance_tail()
+
+        state.buffer[state.head % state.max_buffer_size] = item
+        state.head += 1
+        state.wake_receivers()
+
+    async def send(self, item: T_Item) -> None:
+        await checkpoint()
+        while True:
+            try:
+                self.send_nowait(item)
+                return
+            except WouldBlock:
+                send_event = Event()
+                self._state.waiting_senders.add(send_event)
+                try:
+                    await send_event.wait()
+                finally:
+                    self._state.waiting_senders.discard(send_event)
+
+    def clone(self) -> 'MemoryObjectBroadcastSendStream[T_Item]':
+        """
+        Create a clone of this send stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        sending end of the stream be considered closed by the subscribers.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectBroadcastSendStream(self._state)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._state.open_send_channels -= 1
+            if self._state.open_send_channels == 0:
+                self._state.wake_receivers()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectBroadcastStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectBroadcastSendStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+class _ThreadSafeWaiter:
+    """A task waiting on a thread safe memory object stream, woken up from any thread."""
+
+    __slots__ = 'event', 'asynclib', 'token', 'thread_id'
+
+    def __init__(self) -> None:
+        self.event = Event()
+        self.asynclib = get_asynclib()
+        self.token = self.asynclib.current_token()
+        self.thread_id = threading.get_ident()
+
+    def wake(self) -> None:
+        if threading.get_ident() == self.thread_id:
+            self.event.set()
+        else:
+            self.asynclib.run_sync_soon_from_thread(self.token, self.event.set)
+
+
+@dataclass(eq=False)
+class MemoryObjectThreadSafeStreamState(Generic[T_Item]):
+    max_buffer_size: float
+    lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    #: notified when buffer space frees up, for threads blocked in ``send_blocking()``
+    space_available: threading.Condition = field(init=False)
+    buffer: Deque[T_Item] = field(init=False, default_factory=deque)
+    open_send_channels: int = field(init=False, default=0)
+    open_receive_channels: int = field(init=False, default=0)
+    threads_waiting_send: int = field(init=False, default=0)
+    waiting_receivers: Deque[_ThreadSafeWaiter] = field(init=False, default_factory=deque)
+    waiting_senders: Deque[_ThreadSafeWaiter] = field(init=False, default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self.space_available = threading.Condition(self.lock)
+
+    def notify_senders(self, count: int) -> None:
+        """Wake up waiting senders after ``count`` items have been removed from the buffer."""
+        for _ in range(min(count, len(self.waiting_senders))):
+            self.waiting_senders.popleft().wake()
+
+        if self.threads_waiting_send:
+            self.space_available.notify(count)
+
+    def notify_all(self) -> None:
+        """Wake up everyone (used when one end of the stream is closed)."""
+        for waiters in (self.waiting_receivers, self.waiting_senders):
+            while waiters:
+                waiters.popleft().wake()
+
+        self.space_available.notify_all()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        with self.lock:
+            return MemoryObjectStreamStatistics(
+                len(self.buffer), self.max_buffer_size, self.open_send_channels,
+                self.open_receive_channels,
+                len(self.waiting_senders) + self.threads_waiting_send,
+                len(self.waiting_receivers), 0, 0, 0, math.inf)
+
+
+@dataclass(eq=False)
+class MemoryObjectThreadSafeReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
+    """
+    The receiving end of a thread safe memory object stream.
+
+    Waiting receivers are only woken up once per burst of sent items, so receiving with
+    :meth:`receive_batch` is the most efficient way to consume the items.
+    """
+
+    _state: MemoryObjectThreadSafeStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        with self._state.lock:
+            self._state.open_receive_channels += 1
+
+    def _receive_locked(self, max_items: Optional[int]) -> List[T_Item]:
+        if self._closed:
+            raise ClosedResourceError
+
+        state = self._state
+        buffer = state.buffer
+        if buffer:
+            if max_items is None or max_items >= len(buffer):
+                items = list(buffer)
+                buffer.clear()
+            else:
+                items = [buffer.popleft() for _ in range(max_items)]
+
+            state.notify_senders(len(items))
+            if buffer and state.waiting_receivers:
+                # Let the next receiver have the remaining items
+                state.waiting_receivers.popleft().wake()
+
+            return items
+        elif not state.open_send_channels:
+            raise EndOfStream
+
+        raise WouldBlock
+
+    def receive_nowait(self) -> T_Item:
+        """
+        Receive the next item if it can be done without waiting.
+
+        :return: the received item
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no items in the buffer
+
+        """
+        with self._state.lock:
+            return self._receive_locked(1)[0]
+
+    def receive_nowait_batch(self, max_items: Optional[int] = None) -> List[T_Item]:
+        """
+        Receive all the items currently in the buffer, up to the given limit.
+
+        :param max_items: maximum number of items to receive (``None`` for no limit)
+        :return: a non-empty list of received items
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+        :raises ~anyio.WouldBlock: if there are no items in the buffer
+
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError('max_items must be at least 1')
+
+        with self._state.lock:
+            return self._receive_locked(max_items)
+
+    async def receive_batch(self, max_items: Optional[int] = None) -> List[T_Item]:
+        """
+        Receive at least one item, along with any further items already in the buffer.
+
+        :param max_items: maximum number of items to receive (``None`` for no limit)
+        :return: a non-empty list of received items
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and this stream has been
+            closed from the sending end
+
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError('max_items must be at least 1')
+
+        await checkpoint()
+        state = self._state
+        while True:
+            with state.lock:
+                try:
+                    return self._receive_locked(max_items)
+                except WouldBlock:
+                    # Register as a waiter while still holding the lock, so that a sender can't
+                    # add an item in between without waking us up
+                    waiter = _ThreadSafeWaiter()
+                    state.waiting_receivers.append(waiter)
+
+            try:
+                await waiter.event.wait()
+            except BaseException:
+                with state.lock:
+                    try:
+                        state.waiting_receivers.remove(waiter)
+                    except ValueError:
+                        # We were already woken up, so pass the wakeup on to the next receiver
+                        if state.buffer and state.waiting_receivers:
+                            state.waiting_receivers.popleft().wake()
+
+                raise
+
+    async def iter_batches(self, max_items: Optional[int] = None) -> AsyncIterator[List[T_Item]]:
+        """
+        Iterate over the received items in batches, using :meth:`receive_batch`.
+
+        :param max_items: maximum number of items in each batch (``None`` for no limit)
+
+        """
+        while True:
+            try:
+                yield await self.receive_batch(max_items)
+            except EndOfStream:
+                return
+
+    async def receive(self) -> T_Item:
+        items = await self.receive_batch(1)
+        return items[0]
+
+    def clone(self) -> 'MemoryObjectThreadSafeReceiveStream[T_Item]':
+        """
+        Create a clone of this receive stream.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectThreadSafeReceiveStream(self._state)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        with self._state.lock:
+            if not self._closed:
+                self._closed = True
+                self._state.open_receive_channels -= 1
+                if self._state.open_receive_channels == 0:
+                    self._state.notify_all()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectThreadSafeReceiveStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+@dataclass(eq=False)
+class MemoryObjectThreadSafeSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    """
+    The sending end of a thread safe memory object stream.
+
+    All the methods of this class can be called from any thread. :meth:`send_nowait` and
+    :meth:`send_blocking` are synchronous, and :meth:`send` can be awaited in any event loop, not
+    just the one the receiving end is used in.
+    """
+
+    _state: MemoryObjectThreadSafeStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        with self._state.lock:
+            self._state.open_send_channels += 1
+
+    def _send_locked(self, items: Iterable[T_Item]) -> int:
+        if self._closed:
+            raise ClosedResourceError
+
+        state = self._state
+        if not state.open_receive_channels:
+            raise BrokenResourceError
+
+        count = 0
+        for item in items:
+            if len(state.buffer) >= state.max_buffer_size:
+                break
+
+            state.buffer.append(item)
+            count += 1
+
+        if count and state.waiting_receivers:
+            state.waiting_receivers.popleft().wake()
+
+        return count
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Send an item immediately if it can be done without waiting.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+        :raises ~anyio.WouldBlock: if the buffer is full
+
+        """
+        with self._state.lock:
+            if not self._send_locked((item,)):
+                raise WouldBlock
+
+    def send_nowait_many(self, items: Sequence[T_Item]) -> int:
+        """
+        Send as many of the given items as there is room for in the buffer.
+
+        The waiting receiver (if any) is woken up only once for the entire batch.
+
+        :param items: the items to send
+        :return: the number of items sent (from the start of the sequence)
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+
+        """
+        with self._state.lock:
+            return self._send_locked(items)
+
+    def send_blocking(self, item: T_Item, timeout: Optional[float] = None) -> None:
+        """
+        Send an item, blocking the current thread until there is room in the buffer.
+
+        This must not be called from an event loop thread.
+
+        :param item: the item to send
+        :param timeout: maximum number of seconds to wait for room in the buffer
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+        :raises ~anyio.WouldBlock: if the buffer is still full after ``timeout`` seconds
+
+        """
+        state = self._state
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with state.lock:
+            state.threads_waiting_send += 1
+            try:
+                while not self._send_locked((item,)):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if not state.space_available.wait(remaining):
+                        raise WouldBlock
+            finally:
+                state.threads_waiting_send -= 1
+
+    async def send(self, item: T_Item) -> None:
+        await checkpoint()
+        state = self._state
+        while True:
+            with state.lock:
+                if self._send_locked((item,)):
+                    return
+
+                waiter = _ThreadSafeWaiter()
+                state.waiting_senders.append(waiter)
+
+            try:
+                await waiter.event.wait()
+            except BaseException:
+                with state.lock:
+                    try:
+                        state.waiting_senders.remove(waiter)
+                    except ValueError:
+                        # We were already woken up, so pass the wakeup on to the next sender
+                        if len(state.buffer) < state.max_buffer_size:
+                            state.notify_senders(1)
+
+                raise
+
+    def clone(self) -> 'MemoryObjectThreadSafeSendStream[T_Item]':
+        """
+        Create a clone of this send stream.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectThreadSafeSendStream(self._state)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        Unlike :meth:`aclose`, this method can be called from any thread.
+
+        """
+        with self._state.lock:
+            if not self._closed:
+                self._closed = True
+                self._state.open_send_channels -= 1
+                if self._state.open_send_channels == 0:
+                    self._state.notify_all()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectThreadSafeSendStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+class MemoryObjectSpillingStreamStatistics(NamedTuple):
+    #: number of items in the in-memory buffer
+    current_buffer_used: int
+    max_buffer_size: float
+    open_send_streams: int
+    open_receive_streams: int
+    tasks_waiting_receive: int
+    #: number of items waiting to be written to the spill file
+    items_pending: int
+    #: number of items in the spill file which have not been read back yet
+    items_spilled: int
+    #: number of bytes in the spill file which have not been read back yet
+    spilled_bytes: int
+
+
+@dataclass(eq=False)
+class MemoryObjectSpillingStreamState(Generic[T_Item]):
+    """
+    Holds the items of a spilling stream in three consecutive segments, in the order they were
+    sent: the in-memory buffer, the unread part of the spill file, and finally the items pending
+    to be written to the spill file (``writing`` holds the batch being written, which belongs
+    between the last two).
+
+    Items are only added directly to the buffer when the other segments are empty.
+    """
+
+    max_buffer_size: float
+    spill_batch_size: int
+    dumps: Callable[[T_Item], bytes]
+    loads: Callable[[bytes], T_Item]
+    spill_dir: Optional[str] = None
+    buffer: Deque[T_Item] = field(init=False, default_factory=deque)
+    pending: List[T_Item] = field(init=False, default_factory=list)
+    writing: List[T_Item] = field(init=False, default_factory=list)
+    file: Any = field(init=False, default=None)
+    read_offset: int = field(init=False, default=0)
+    write_offset: int = field(init=False, default=0)
+    items_spilled: int = field(init=False, default=0)
+    io_lock: Lock = field(init=False, default_factory=Lock)
+    open_send_channels: int = field(init=False, default=0)
+    open_receive_channels: int = field(init=False, default=0)
+    waiting_receivers: Set[Event] = field(init=False, default_factory=set)
+
+    def notify_receivers(self) -> None:
+        for event in self.waiting_receivers:
+            event.set()
+
+        self.waiting_receivers.clear()
+
+    def move_pending(self) -> None:
+        """Move pending items straight to the buffer if nothing is spilled before them."""
+        if not self.items_spilled and not self.writing:
+            room = int(min(self.max_buffer_size - len(self.buffer), len(self.pending)))
+            if room > 0:
+                self.buffer.extend(self.pending[:room])
+                del self.pending[:room]
+
+    def _write_batch(self, items: List[T_Item]) -> int:
+        data = bytearray()
+        for item in items:
+            encoded = self.dumps(item)
+            data += _spill_record_length.pack(len(encoded))
+            data += encoded
+
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(dir=self.spill_dir)
+
+        self.file.seek(self.write_offset)
+        self.file.write(data)
+        return len(data)
+
+    def _read_batch(self, count: int) -> Tuple[List[T_Item], int]:
+        self.file.seek(self.read_offset)
+        items: List[T_Item] = []
+        size = 0
+        for _ in range(count):
+            length = _spill_record_length.unpack(self.file.read(_spill_record_length.size))[0]
+            items.append(self.loads(self.file.read(length)))
+            size += _spill_record_length.size + length
+
+        if count == self.items_spilled:
+            # Everything has been read back, so the file can be reused from the start
+            self.file.seek(0)
+            self.file.truncate()
+
+        return items, size
+
+    async def spill(self) -> None:
+        """Write the pending items to the spill file if there's a full batch of them."""
+        async with self.io_lock:
+            if len(self.pending) < self.spill_batch_size or not self.open_receive_channels:
+                return
+
+            self.writing, self.pending = self.pending, []
+            try:
+                size = await to_thread.run_sync(self._write_batch, self.writing)
+            except BaseException:
+                self.pending[:0] = self.writing
+                raise
+            else:
+                self.write_offset += size
+                self.items_spilled += len(self.writing)
+            finally:
+                self.writing = []
+                if not self.open_receive_channels:
+                    self.discard()
+
+                self.notify_receivers()
+
+    async def load(self) -> None:
+        """Read a batch of spilled items back to the buffer."""
+        async with self.io_lock:
+            if not self.items_spilled:
+                return
+
+            count = int(min(max(self.max_buffer_size - len(self.buffer), 1), self.items_spilled))
+            try:
+                items, size = await to_thread.run_sync(self._read_batch, count)
+                self.buffer.extend(items)
+                self.items_spilled -= count
+                if self.items_spilled:
+                    self.read_offset += size
+                else:
+                    self.read_offset = self.write_offset = 0
+                    self.move_pending()
+            finally:
+                if not self.open_receive_channels:
+                    self.discard()
+
+                self.notify_receivers()
+
+    def discard(self) -> None:
+        """Throw away all the items that haven't been received, and delete the spill file."""
+        self.buffer.clear()
+        self.pending.clear()
+        self.items_spilled = self.read_offset = self.write_offset = 0
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def statistics(self) -> MemoryObjectSpillingStreamStatistics:
+        return MemoryObjectSpillingStreamStatistics(
+            len(self.buffer), self.max_buffer_size, self.open_send_channels,
+            self.open_receive_channels, len(self.waiting_receivers),
+            len(self.pending) + len(self.writing), self.items_spilled,
+            self.write_offset - self.read_offset)
+
+
+@dataclass(eq=False)
+class MemoryObjectSpillingReceiveStream(Generic[T_Item], ObjectReceiveStream[T_Item]):
+    _state: MemoryObjectSpillingStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self._state.open_receive_channels += 1
+
+    def receive_nowait(self) -> T_Item:
+        """
+        Receive the next item if it can be done without waiting.
+
+        Items that have been spilled to disk can only be read back by :meth:`receive`, so this
+        method raises :exc:`~anyio.WouldBlock` when the next item is in the spill file.
+
+        :return: the received item
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if there are no items left and this stream has been closed
+            from the sending end
+        :raises ~anyio.WouldBlock: if the next item is not in memory
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        state = self._state
+        if not state.buffer and state.pending:
+            state.move_pending()
+
+        if state.buffer:
+            return state.buffer.popleft()
+        elif not state.open_send_channels and not (state.items_spilled or state.writing or
+                                                   state.pending):
+            raise EndOfStream
+
+        raise WouldBlock
+
+    async def receive(self) -> T_Item:
+        await checkpoint()
+        state = self._state
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                pass
+
+            if state.items_spilled and not state.io_lock.locked():
+                await state.load()
+            else:
+                # Wait for new items to be sent, or for the ongoing file operation to finish
+                event = Event()
+                state.waiting_receivers.add(event)
+                try:
+                    await event.wait()
+                finally:
+                    state.waiting_receivers.discard(event)
+
+    def clone(self) -> 'MemoryObjectSpillingReceiveStream[T_Item]':
+        """
+        Create a clone of this receive stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        receiving end of the memory stream be considered closed by the sending ends.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectSpillingReceiveStream(self._state)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        When the last receive stream is closed, all the remaining items are discarded and the
+        spill file is deleted.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._state.open_receive_channels -= 1
+            if not self._state.open_receive_channels and not self._state.io_lock.locked():
+                self._state.discard()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectSpillingStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectSpillingReceiveStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+@dataclass(eq=False)
+class MemoryObjectSpillingSendStream(Generic[T_Item], ObjectSendStream[T_Item]):
+    _state: MemoryObjectSpillingStreamState[T_Item]
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self._state.open_send_channels += 1
+
+    def send_nowait(self, item: T_Item) -> None:
+        """
+        Send an item immediately if it can be done without waiting.
+
+        Once the in-memory buffer is full, items are collected into a batch which is then written
+        to the spill file by :meth:`send`. This method raises :exc:`~anyio.WouldBlock` when that
+        batch is full.
+
+        :param item: the item to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the stream has been closed from the
+            receiving end
+        :raises ~anyio.WouldBlock: if the buffer is full and the batch of items to be spilled is
+            full too
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if not self._state.open_receive_channels:
+            raise BrokenResourceError
+
+        state = self._state
+        if not (state.pending or state.writing or state.items_spilled) and \
+                len(state.buffer) < state.max_buffer_size:
+            state.buffer.append(item)
+        elif len(state.pending) < state.spill_batch_size:
+            state.pending.append(item)
+        else:
+            raise WouldBlock
+
+        state.notify_receivers()
+
+    async def send(self, item: T_Item) -> None:
+        await checkpoint()
+        while True:
+            try:
+                self.send_nowait(item)
+                return
+            except WouldBlock:
+                await self._state.spill()
+
+    def clone(self) -> 'MemoryObjectSpillingSendStream[T_Item]':
+        """
+        Create a clone of this send stream.
+
+        Each clone can be closed separately. Only when all clones have been closed will the
+        sending end of the memory stream be considered closed by the receiving ends.
+
+        :return: the cloned stream
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        return MemoryObjectSpillingSendStream(self._state)
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._state.open_send_channels -= 1
+            if not self._state.open_send_channels:
+                self._state.notify_receivers()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def statistics(self) -> MemoryObjectSpillingStreamStatistics:
+        """Return statistics about the current state of this stream."""
+        return self._state.statistics()
+
+    def __enter__(self) -> 'MemoryObjectSpillingSendStream[T_Item]':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+@dataclass(eq=False)
+class MemoryBytePipe:
+    """One direction of a memory byte stream pair."""
+
+    max_buffer_bytes: float
+    #: the written chunks, the first of which may have been partially read (up to ``offset``)
+    chunks: Deque[bytes] = field(init=False, default_factory=deque)
+    offset: int = field(init=False, default=0)
+    buffered_bytes: int = field(init=False, default=0)
+    #: set when the writing end has sent an end-of-file indication or has been closed
+    eof: bool = field(init=False, default=False)
+    reader_closed: bool = field(init=False, default=False)
+    #: there can only be one waiting task on either end, thanks to the resource guards
+    waiting_receiver: Optional[Event] = field(init=False, default=None)
+    waiting_sender: Optional[Event] = field(init=False, default=None)
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+        self.buffered_bytes += len(data)
+        self.wake_receiver()
+
+    def read(self, max_bytes: int) -> bytes:
+        first = self.chunks[0]
+        available = len(first) - self.offset
+        if available <= max_bytes and (len(self.chunks) == 1 or available == max_bytes):
+            # Hand over the rest of the first chunk (without copying, if it's untouched)
+            data = first[self.offset:] if self.offset else first
+            self.chunks.popleft()
+            self.offset = 0
+        elif available > max_bytes:
+            data = first[self.offset:self.offset + max_bytes]
+            self.offset += max_bytes
+        else:
+            # Combine several small chunks into one
+            parts = [first[self.offset:] if self.offset else first]
+            self.chunks.popleft()
+            self.offset = 0
+            remaining = max_bytes - available
+            while self.chunks and remaining:
+                chunk = self.chunks[0]
+                if len(chunk) <= remaining:
+                    parts.append(chunk)
+                    self.chunks.popleft()
+                    remaining -= len(chunk)
+                else:
+                    parts.append(chunk[:remaining])
+                    self.offset = remaining
+                    remaining = 0
+
+            data = b''.join(parts)
+
+        self.buffered_bytes -= len(data)
+        self.wake_sender()
+        return data
+
+    def read_into(self, buffer: Union[bytearray, memoryview]) -> int:
+        nbytes = 0
+        while self.chunks and nbytes < len(buffer):
+            chunk = self.chunks[0]
+            size = min(len(chunk) - self.offset, len(buffer) - nbytes)
+            buffer[nbytes:nbytes + size] = memoryview(chunk)[self.offset:self.offset + size]
+            nbytes += size
+            if self.offset + size == len(chunk):
+                self.chunks.popleft()
+                self.offset = 0
+            else:
+                self.offset += size
+
+        self.buffered_bytes -= nbytes
+        self.wake_sender()
+        return nbytes
+
+    def close_reader(self) -> None:
+        self.reader_closed = True
+        self.chunks.clear()
+        self.offset = self.buffered_bytes = 0
+        self.wake_sender()
+        self.wake_receiver()
+
+    def close_writer(self) -> None:
+        self.eof = True
+        self.wake_receiver()
+        self.wake_sender()
+
+    def wake_receiver(self) -> None:
+        if self.waiting_receiver is not None:
+            self.waiting_receiver.set()
+            self.waiting_receiver = None
+
+    def wake_sender(self) -> None:
+        if self.waiting_sender is not None:
+            self.waiting_sender.set()
+            self.waiting_sender = None
+
+    async def wait_receivable(self) -> None:
+        self.waiting_receiver = event = Event()
+        try:
+            await event.wait()
+        finally:
+            if self.waiting_receiver is event:
+                self.waiting_receiver = None
+
+    async def wait_sendable(self) -> None:
+        self.waiting_sender = event = Event()
+        try:
+            await event.wait()
+        finally:
+            if self.waiting_sender is event:
+                self.waiting_sender = None
+
+
+class MemoryByteStream(ByteStream):
+    """
+    One end of an in-memory bidirectional byte stream.
+
+    Sent :class:`bytes` objects are passed to the other end without copying them, and are only
+    sliced when the receiver asks for fewer bytes than are available in a chunk.
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, receive_pipe: MemoryBytePipe, send_pipe: MemoryBytePipe):
+        self._receive_pipe = receive_pipe
+        self._send_pipe = send_pipe
+        self._closed = False
+        self._receive_guard = ResourceGuard('reading from')
+        self._send_guard = ResourceGuard('writing to')
+
+    async def receive(self, max_bytes: int = 65536) -> bytes:
+        with self._receive_guard:
+            pipe = self._receive_pipe
+            if not pipe.buffered_bytes and not pipe.eof and not self._closed:
+                # Waiting for data counts as a checkpoint
+                while not pipe.buffered_bytes and not pipe.eof and not self._closed:
+                    await pipe.wait_receivable()
+            else:
+                await checkpoint()
+
+            if self._closed:
+                raise ClosedResourceError
+            elif pipe.buffered_bytes:
+                return pipe.read(max_bytes)
+            else:
+                raise EndOfStream
+
+    async def receive_into(self, buffer: Union[bytearray, memoryview]) -> int:
+        with self._receive_guard:
+            pipe = self._receive_pipe
+            if not pipe.buffered_bytes and not pipe.eof and not self._closed:
+                while not pipe.buffered_bytes and not pipe.eof and not self._closed:
+                    await pipe.wait_receivable()
+            else:
+                await checkpoint()
+
+            if self._closed:
+                raise ClosedResourceError
+            elif pipe.buffered_bytes:
+                return pipe.read_into(buffer)
+            else:
+                raise EndOfStream
+
+    async def send(self, item: bytes) -> None:
+        """
+        Send the given bytes to the peer.
+
+        This waits until the amount of data buffered for the peer is below the buffer size limit,
+        and then appends the entire item to the buffer.
+
+        :param item: the bytes to send
+        :raises ~anyio.ClosedResourceError: if this stream has been closed, or if an end-of-file
+            indication has been sent
+        :raises ~anyio.BrokenResourceError: if the peer has been closed
+
+        """
+        with self._send_guard:
+            await checkpoint()
+            if not isinstance(item, bytes):
+                item = bytes(item)
+
+            pipe = self._send_pipe
+            while True:
+                if self._closed or pipe.eof:
+                    raise ClosedResourceError
+                elif pipe.reader_closed:
+                    raise BrokenResourceError
+                elif pipe.buffered_bytes < pipe.max_buffer_bytes:
+                    if item:
+                        pipe.write(item)
+
+                    return
+
+                await pipe.wait_sendable()
+
+    async def send_eof(self) -> None:
+        self._send_pipe.close_writer()
+
+    def close(self) -> None:
+        """
+        Close the stream.
+
+        This works the exact same way as :meth:`aclose`, but is provided as a special case for the
+        benefit of synchronous callbacks.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._send_pipe.close_writer()
+            self._receive_pipe.close_reader()
+
+    async def aclose(self) -> None:
+        self.close()
@@ -0,0 +1,494 @@
+"""
+Single producer, single consumer message channels between processes, built on shared memory.
+
+This module requires Python 3.8 or later.
+"""
+
+import select
+import socket
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import Any, Callable, Optional, Tuple, Type, Union
+
+from .. import (
+    BrokenResourceError, BusyResourceError, ClosedResourceError, EndOfStream, WouldBlock,
+    move_on_after, wait_socket_readable)
+from ..abc import ObjectReceiveStream, ObjectSendStream
+from ..lowlevel import checkpoint
+
+# Layout of the header at the start of the shared memory segment. The read and write positions
+# are running byte counts, so the ring is empty when they're equal.
+_WRITE_POS = 0  # uint64, only written by the producer
+_READ_POS = 8  # uint64, only written by the consumer
+_PRODUCER_WAITING = 16  # uint8, set when the producer is waiting for free space
+_CONSUMER_WAITING = 17  # uint8, set when the consumer is waiting for data
+_PRODUCER_STATE = 18  # uint8, one of the _STATE_* constants below
+_CONSUMER_STATE = 19  # uint8
+_PRODUCER_PORT = 20  # uint16, UDP port of the producer's doorbell socket
+_CONSUMER_PORT = 22  # uint16
+_CAPACITY = 24  # uint64, size of the data area following the header
+_HEADER_SIZE = 64
+
+#: Upper limit for a single wait for the doorbell, after which the buffer is checked again. This
+#: guards against a lost wakeup if the waiting flag and the buffer position writes are reordered.
+_MAX_WAIT = 1
+
+_STATE_UNUSED = 0
+_STATE_OPEN = 1
+_STATE_CLOSED = 2
+
+_uint64 = struct.Struct('<Q')
+_uint16 = struct.Struct('<H')
+_length = struct.Struct('<I')
+
+
+def _open_shared_memory(name: Optional[str], size: int) -> shared_memory.SharedMemory:
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+
+    shm = shared_memory.SharedMemory(name)
+    if sys.platform != 'win32':
+        # Prevent the resource tracker from destroying the segment when this process exits, as
+        # the segment is owned by the process that created it
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')  # type: ignore[attr-defined]
+
+    return shm
+
+
+class SharedMemoryChannel:
+    """
+    A one-way message channel between two processes, backed by a shared memory ring buffer.
+
+    The process that creates the channel owns the shared memory segment, and destroys it when the
+    channel is closed. The channel object can be pickled (for example, passed as an argument to
+    :func:`anyio.to_process.run_sync`) and the unpickled copy attaches to the same segment.
+
+    One end of the channel can be opened as a send stream, and the other as a receive stream.
+    Messages are copied directly into and out of the shared buffer, and the peer is only notified
+    (via a doorbell datagram on a loopback UDP socket) when it is actually waiting.
+
+    .. note:: The buffer positions are updated without locks, relying on the ordering of memory
+        writes by a single producer and a single consumer. Each end must only be used by one
+        thread or task at a time.
+
+    :param capacity: size of the ring buffer, in bytes (each message takes up 4 additional bytes)
+
+    .. versionadded:: 3.3
+    """
+
+    def __init__(self, capacity: int = 1048576, *, _name: Optional[str] = None):
+        if _name is None and capacity < 8:
+            raise ValueError('capacity must be at least 8 bytes')
+
+        self._shm = _open_shared_memory(_name, _HEADER_SIZE + capacity)
+        self._owner = _name is None
+        self._buffer: Optional[memoryview] = self._shm.buf
+        if self._owner:
+            _uint64.pack_into(self._shm.buf, _CAPACITY, capacity)
+
+        #: size of the ring buffer, in bytes
+        self.capacity: int = _uint64.unpack_from(self._shm.buf, _CAPACITY)[0]
+
+    def __reduce__(self) -> Tuple[Callable[..., Any], Tuple[Any, ...]]:
+        return _attach_channel, (self._shm.name,)
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory segment."""
+        return self._shm.name
+
+    def open_send_stream(self) -> 'SharedMemoryObjectSendStream':
+        """
+        Open the sending end of the channel.
+
+        :raises ~anyio.BusyResourceError: if the sending end has already been opened
+
+        """
+        return SharedMemoryObjectSendStream(self)
+
+    def open_receive_stream(self) -> 'SharedMemoryObjectReceiveStream':
+        """
+        Open the receiving end of the channel.
+
+        :raises ~anyio.BusyResourceError: if the receiving end has already been opened
+
+        """
+        return SharedMemoryObjectReceiveStream(self)
+
+    def close(self) -> None:
+        """
+        Close this process's mapping of the shared memory segment.
+
+        If this process created the channel, the segment is also destroyed.
+
+        """
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+
+    def __enter__(self) -> 'SharedMemoryChannel':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+def _attach_channel(name: str) -> SharedMemoryChannel:
+    return SharedMemoryChannel(_name=name)
+
+
+class _ChannelEnd:
+    """Code shared by both ends of the channel."""
+
+    _state_offset: int
+    _port_offset: int
+    _peer_state_offset: int
+    _peer_port_offset: int
+    _waiting_offset: int
+
+    def __init__(self, channel: SharedMemoryChannel):
+        if channel._buffer is None:
+            raise ClosedResourceError
+
+        self._channel = channel
+        self._buf = channel._buffer
+        self._capacity = channel.capacity
+        if self._buf[self._state_offset] != _STATE_UNUSED:
+            raise BusyResourceError('using this end of the channel')
+
+        self._doorbell = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._doorbell.bind(('127.0.0.1', 0))
+        self._doorbell.setblocking(False)
+        _uint16.pack_into(self._buf, self._port_offset, self._doorbell.getsockname()[1])
+        self._buf[self._state_offset] = _STATE_OPEN
+        self._closed = False
+
+    def _ring_peer(self) -> None:
+        port = _uint16.unpack_from(self._buf, self._peer_port_offset)[0]
+        try:
+            self._doorbell.sendto(b'\x00', ('127.0.0.1', port))
+        except OSError:
+            # The peer's doorbell socket buffer is full, so it will be woken up anyway
+            pass
+
+    def _drain_doorbell(self) -> None:
+        try:
+            while True:
+                self._doorbell.recv(64)
+        except OSError:
+            pass
+
+    def _prepare_wait(self) -> None:
+        self._buf[self._waiting_offset] = 1
+
+    def _end_wait(self) -> None:
+        self._buf[self._waiting_offset] = 0
+        self._drain_doorbell()
+
+    async def _wait(self) -> None:
+        try:
+            with move_on_after(_MAX_WAIT):
+                await wait_socket_readable(self._doorbell)
+        finally:
+            self._end_wait()
+
+    def _wait_blocking(self, deadline: Optional[float]) -> None:
+        try:
+            if deadline is None:
+                timeout: float = _MAX_WAIT
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise WouldBlock
+
+                timeout = min(timeout, _MAX_WAIT)
+
+            select.select([self._doorbell], [], [], timeout)
+        finally:
+            self._end_wait()
+
+    @property
+    def _peer_closed(self) -> bool:
+        return self._buf[self._peer_state_offset] == _STATE_CLOSED
+
+    def close(self) -> None:
+        """
+        Close this end of the channel.
+
+        Unlike :meth:`aclose`, this method is synchronous.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._buf[self._state_offset] = _STATE_CLOSED
+            if self._buf[self._peer_state_offset] == _STATE_OPEN:
+                self._ring_peer()
+
+            self._doorbell.close()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+class SharedMemoryObjectSendStream(_ChannelEnd, ObjectSendStream[bytes]):
+    """
+    The sending end of a :class:`SharedMemoryChannel`.
+
+    In addition to the asynchronous :meth:`send` method, the blocking :meth:`send_blocking`
+    method is provided for synchronous code, such as functions run in worker processes.
+    """
+
+    _state_offset = _PRODUCER_STATE
+    _port_offset = _PRODUCER_PORT
+    _waiting_offset = _PRODUCER_WAITING
+    _peer_state_offset = _CONSUMER_STATE
+    _peer_port_offset = _CONSUMER_PORT
+
+    def __init__(self, channel: SharedMemoryChannel):
+        super().__init__(channel)
+        self._write_pos = _uint64.unpack_from(self._buf, _WRITE_POS)[0]
+
+    def _copy_in(self, pos: int, data: Union[bytes, memoryview]) -> None:
+        offset = pos % self._capacity
+        first = min(len(data), self._capacity - offset)
+        start = _HEADER_SIZE + offset
+        self._buf[start:start + first] = data[:first]
+        if first < len(data):
+            self._buf[_HEADER_SIZE:_HEADER_SIZE + len(data) - first] = data[first:]
+
+    def send_nowait(self, item: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Send a message if there's enough free space for it in the buffer.
+
+        :param item: the message to send
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the receiving end has been closed
+        :raises ~anyio.WouldBlock: if there is not enough free space in the buffer
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+        if self._peer_closed:
+            raise BrokenResourceError
+
+        data = memoryview(item).cast('B')
+        needed = _length.size + len(data)
+        if needed > self._capacity:
+            raise ValueError(f'the message is too large for the buffer ({len(data)} > '
+                             f'{self._capacity - _length.size} bytes)')
+
+        read_pos = _uint64.unpack_from(self._buf, _READ_POS)[0]
+        if self._capacity - (self._write_pos - read_pos) < needed:
+            raise WouldBlock
+
+        start = _HEADER_SIZE + self._write_pos % self._capacity
+        if start + needed <= _HEADER_SIZE + self._capacity:
+            # Fast path: the whole message fits without wrapping around
+            _length.pack_into(self._buf, start, len(data))
+            self._buf[start + _length.size:start + needed] = data
+        else:
+            self._copy_in(self._write_pos, _length.pack(len(data)))
+            self._copy_in(self._write_pos + _length.size, data)
+
+        self._write_pos += needed
+        _uint64.pack_into(self._buf, _WRITE_POS, self._write_pos)
+        if self._buf[_CONSUMER_WAITING]:
+            self._ring_peer()
+
+    async def send(self, item: Union[bytes, bytearray, memoryview]) -> None:
+        await checkpoint()
+        while True:
+            try:
+                self.send_nowait(item)
+                return
+            except WouldBlock:
+                self._prepare_wait()
+                try:
+                    # Check again in case the consumer freed up space before seeing the flag
+                    self.send_nowait(item)
+                except WouldBlock:
+                    await self._wait()
+                    continue
+                except BaseException:
+                    self._end_wait()
+                    raise
+
+                self._end_wait()
+                return
+
+    def send_blocking(self, item: Union[bytes, bytearray, memoryview],
+                      timeout: Optional[float] = None) -> None:
+        """
+        Send a message, blocking the current thread until there's room for it in the buffer.
+
+        :param item: the message to send
+        :param timeout: maximum number of seconds to wait for room in the buffer
+        :raises ~anyio.ClosedResourceError: if this send stream has been closed
+        :raises ~anyio.BrokenResourceError: if the receiving end has been closed
+        :raises ~anyio.WouldBlock: if there is still not enough free space after ``timeout``
+            seconds
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                self.send_nowait(item)
+                return
+            except WouldBlock:
+                self._prepare_wait()
+                try:
+                    self.send_nowait(item)
+                except WouldBlock:
+                    self._wait_blocking(deadline)
+                    continue
+                except BaseException:
+                    self._end_wait()
+                    raise
+
+                self._end_wait()
+                return
+
+
+class SharedMemoryObjectReceiveStream(_ChannelEnd, ObjectReceiveStream[bytes]):
+    """
+    The receiving end of a :class:`SharedMemoryChannel`.
+
+    In addition to the asynchronous :meth:`receive` method, the blocking
+    :meth:`receive_blocking` method is provided for synchronous code, such as functions run in
+    worker processes.
+    """
+
+    _state_offset = _CONSUMER_STATE
+    _port_offset = _CONSUMER_PORT
+    _waiting_offset = _CONSUMER_WAITING
+    _peer_state_offset = _PRODUCER_STATE
+    _peer_port_offset = _PRODUCER_PORT
+
+    def __init__(self, channel: SharedMemoryChannel):
+        super().__init__(channel)
+        self._read_pos = _uint64.unpack_from(self._buf, _READ_POS)[0]
+
+    def _copy_out(self, pos: int, size: int) -> bytes:
+        offset = pos % self._capacity
+        first = min(size, self._capacity - offset)
+        start = _HEADER_SIZE + offset
+        if first == size:
+            return bytes(self._buf[start:start + size])
+
+        return bytes(self._buf[start:start + first]) + \
+            bytes(self._buf[_HEADER_SIZE:_HEADER_SIZE + size - first])
+
+    def receive_nowait(self) -> bytes:
+        """
+        Receive the next message if one is available.
+
+        :return: the received message
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and the sending end has been closed
+        :raises ~anyio.WouldBlock: if the buffer is empty
+
+        """
+        if self._closed:
+            raise ClosedResourceError
+
+        write_pos = _uint64.unpack_from(self._buf, _WRITE_POS)[0]
+        if write_pos == self._read_pos:
+            # Check the write position again after seeing the closed state, as the producer may
+            # have sent more messages just before closing
+            if self._peer_closed and \
+                    _uint64.unpack_from(self._buf, _WRITE_POS)[0] == self._read_pos:
+                raise EndOfStream
+
+            raise WouldBlock
+
+        start = _HEADER_SIZE + self._read_pos % self._capacity
+        if start + _length.size <= _HEADER_SIZE + self._capacity:
+            size = _length.unpack_from(self._buf, start)[0]
+        else:
+            size = _length.unpack(self._copy_out(self._read_pos, _length.size))[0]
+
+        if start + _length.size + size <= _HEADER_SIZE + self._capacity:
+            message = bytes(self._buf[start + _length.size:start + _length.size + size])
+        else:
+            message = self._copy_out(self._read_pos + _length.size, size)
+
+        self._read_pos += _length.size + size
+        _uint64.pack_into(self._buf, _READ_POS, self._read_pos)
+
+        # Only wake up a waiting producer once at least half the buffer is free (or the buffer is
+        # empty), so that a full buffer does not cause a wakeup for every message received
+        if self._buf[_PRODUCER_WAITING]:
+            used = write_pos - self._read_pos
+            if not used or used <= self._capacity // 2:
+                self._ring_peer()
+
+        return message
+
+    async def receive(self) -> bytes:
+        await checkpoint()
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                self._prepare_wait()
+                try:
+                    # Check again in case the producer sent something before seeing the flag
+                    message = self.receive_nowait()
+                except WouldBlock:
+                    await self._wait()
+                    continue
+                except BaseException:
+                    self._end_wait()
+                    raise
+
+                self._end_wait()
+                return message
+
+    def receive_blocking(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Receive the next message, blocking the current thread until one is available.
+
+        :param timeout: maximum number of seconds to wait for a message
+        :return: the received message
+        :raises ~anyio.ClosedResourceError: if this receive stream has been closed
+        :raises ~anyio.EndOfStream: if the buffer is empty and the sending end has been closed
+        :raises ~anyio.WouldBlock: if no message arrived within ``timeout`` seconds
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.receive_nowait()
+            except WouldBlock:
+                self._prepare_wait()
+                try:
+                    message = self.receive_nowait()
+                except WouldBlock:
+                    self._wait_blocking(deadline)
+                    continue
+                except BaseException:
+                    self._end_wait()
+                    raise
+
+                self._end_wait()
+                return message
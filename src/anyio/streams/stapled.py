@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Any, Callable, Generic, List, Mapping, Optional, Sequence, TypeVar
+from typing import (
+    Any, Callable, Generic, List, Mapping, Optional, Sequence, TypeVar, Union)
 
 from ..abc import (
     ByteReceiveStream, ByteSendStream, ByteStream, Listener, ObjectReceiveStream, ObjectSendStream,
@@ -27,6 +28,9 @@ class StapledByteStream(ByteStream):
     async def receive(self, max_bytes: int = 65536) -> bytes:
         return await self.receive_stream.receive(max_bytes)
 
+    async def receive_into(self, buffer: Union[bytearray, memoryview]) -> int:
+        return await self.receive_stream.receive_into(buffer)
+
     async def send(self, item: bytes) -> None:
         await self.send_stream.send(item)
 
@@ -1,7 +1,11 @@
+from typing import List
+
 import pytest
 
-from anyio import IncompleteRead, create_memory_object_stream
-from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio import (
+    CancelScope, ClosedResourceError, DelimiterNotFound, EndOfStream, IncompleteRead, WouldBlock,
+    create_memory_byte_stream_pair, create_memory_object_stream, create_task_group, fail_after)
+from anyio.streams.buffered import BufferedByteReceiveStream, BufferedByteSendStream
 
 pytestmark = pytest.mark.anyio
 
@@ -49,3 +53,171 @@ async def test_receive_until_incomplete() -> None:
         assert await buffered_stream.receive_until(b'de', 10)
 
     assert buffered_stream.buffer == b'abcd'
+
+
+async def test_receive_into() -> None:
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abcdef')
+    await send_stream.send(b'gh')
+    buffer = bytearray(4)
+    assert await buffered_stream.receive_into(buffer) == 4
+    assert buffer == b'abcd'
+    assert await buffered_stream.receive_into(memoryview(buffer)[1:]) == 2
+    assert buffer == b'aefd'
+    assert await buffered_stream.receive_into(buffer) == 2
+    assert buffer == b'ghfd'
+
+    await send_stream.aclose()
+    with pytest.raises(EndOfStream):
+        await buffered_stream.receive_into(buffer)
+
+
+async def test_receive_into_byte_stream() -> None:
+    stream1, stream2 = create_memory_byte_stream_pair()
+    buffered_stream = BufferedByteReceiveStream(stream2)
+    await stream1.send(b'abcd')
+    await stream1.send(b'efgh')
+    assert await buffered_stream.receive_exactly(3) == b'abc'
+    buffer = bytearray(8)
+    assert await buffered_stream.receive_into(buffer) == 5
+    assert buffer[:5] == b'defgh'
+
+
+@pytest.mark.parametrize('delimiters, expected', [
+    ([b'\r\n', b'\n'], [b'abc', b'def', b'ghi']),
+    ([b'\r', b'\r\n'], [b'abc', b'def\nghi']),
+    ([b'\n', b';'], [b'abc\r', b'def', b'ghi'])
+], ids=['crlf', 'longest', 'mixed'])
+async def test_receive_until_any(delimiters: List[bytes], expected: List[bytes]) -> None:
+    send_stream, receive_stream = create_memory_object_stream(4)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    for chunk in b'abc\r', b'\ndef', b'\nghi;', b'\r':
+        await send_stream.send(chunk)
+
+    for record in expected:
+        assert await buffered_stream.receive_until_any(delimiters, 10) == record
+
+
+async def test_receive_until_any_errors() -> None:
+    send_stream, receive_stream = create_memory_object_stream(2)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    with pytest.raises(ValueError):
+        await buffered_stream.receive_until_any([b'\n', b''], 10)
+
+    await send_stream.send(b'abcdefgh')
+    with pytest.raises(DelimiterNotFound):
+        await buffered_stream.receive_until_any([b'\n', b';'], 8)
+
+    await send_stream.aclose()
+    with pytest.raises(IncompleteRead):
+        await buffered_stream.receive_until_any([b'\n', b';'], 10)
+
+
+async def test_iter_lines() -> None:
+    send_stream, receive_stream = create_memory_object_stream(4)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    for chunk in b'abc\r\ndef\n', b'gh', b'i\r', b'\n':
+        await send_stream.send(chunk)
+
+    await send_stream.aclose()
+    assert [line async for line in buffered_stream.iter_lines()] == [b'abc', b'def', b'ghi']
+
+
+async def test_iter_until_no_checkpoint() -> None:
+    """Test that records already in the buffer are yielded without receiving from the stream."""
+    send_stream, receive_stream = create_memory_object_stream(1)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'a;b;c;d')
+    records = []
+    with pytest.raises(WouldBlock):
+        with CancelScope() as scope:
+            async for record in buffered_stream.iter_until(b';'):
+                records.append(record)
+                if len(records) == 3:
+                    scope.cancel()
+                    receive_stream.receive_nowait()
+
+    assert records == [b'a', b'b', b'c']
+
+
+async def test_iter_until_incomplete() -> None:
+    send_stream, receive_stream = create_memory_object_stream(1)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'a;;bc')
+    await send_stream.aclose()
+    records = []
+    with pytest.raises(IncompleteRead):
+        async for record in buffered_stream.iter_until(b';'):
+            records.append(record)
+
+    assert records == [b'a', b'']
+
+
+async def test_iter_until_delimiter_not_found() -> None:
+    send_stream, receive_stream = create_memory_object_stream(1)
+    buffered_stream = BufferedByteReceiveStream(receive_stream)
+    await send_stream.send(b'abcdef')
+    with pytest.raises(DelimiterNotFound):
+        async for record in buffered_stream.iter_until(b';', 4):
+            pass
+
+
+class TestBufferedByteSendStream:
+    async def test_flush_threshold(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream, 4)
+        await buffered_stream.send(b'ab')
+        await buffered_stream.send(b'c')
+        assert receive_stream.statistics().current_buffer_used == 0
+        await buffered_stream.send(b'de')
+        assert receive_stream.receive_nowait() == b'abcde'
+
+        # Large items are sent as is when nothing is buffered
+        item = b'fghij'
+        await buffered_stream.send(item)
+        assert receive_stream.receive_nowait() is item
+
+    async def test_flush(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream)
+        await buffered_stream.send(b'abc')
+        await buffered_stream.send(b'def')
+        await buffered_stream.flush()
+        await buffered_stream.flush()
+        assert receive_stream.receive_nowait_batch() == [b'abcdef']
+        assert buffered_stream.statistics() == (0, 1, 6)
+        assert buffered_stream.statistics().average_flush_size == 6
+
+    async def test_aclose(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        buffered_stream = BufferedByteSendStream(send_stream)
+        async with buffered_stream:
+            await buffered_stream.send(b'abc')
+
+        assert receive_stream.receive_nowait() == b'abc'
+        with pytest.raises(EndOfStream):
+            receive_stream.receive_nowait()
+
+        with pytest.raises(ClosedResourceError):
+            await buffered_stream.send(b'def')
+
+    async def test_flush_delay(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        async with create_task_group() as tg:
+            buffered_stream = BufferedByteSendStream(send_stream, flush_delay=0.1, task_group=tg)
+            await buffered_stream.send(b'abc')
+            await buffered_stream.send(b'def')
+            with fail_after(1):
+                assert await receive_stream.receive() == b'abcdef'
+
+            assert buffered_stream.statistics().flush_count == 1
+
+    def test_flush_delay_without_task_group(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        pytest.raises(ValueError, BufferedByteSendStream, send_stream, flush_delay=1).\
+            match('task_group is required when flush_delay is set')
+
+    def test_average_flush_size_empty(self) -> None:
+        send_stream, receive_stream = create_memory_object_stream(10)
+        assert BufferedByteSendStream(send_stream).statistics().average_flush_size == 0
@@ -0,0 +1,122 @@
+from typing import Tuple
+
+import pytest
+
+from anyio import (
+    BrokenResourceError, EndOfStream, IncompleteRead, create_memory_byte_stream_pair,
+    create_memory_object_stream)
+from anyio.streams.framed import FramedByteStream
+from anyio.streams.memory import MemoryByteStream
+from anyio.streams.stapled import StapledObjectStream
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def streams() -> Tuple[MemoryByteStream, MemoryByteStream]:
+    return create_memory_byte_stream_pair(1024 * 1024)
+
+
+@pytest.mark.parametrize('header_format, byteorder, header', [
+    ('u16', 'big', b'\x00\x05'),
+    ('u16', 'little', b'\x05\x00'),
+    ('u32', 'big', b'\x00\x00\x00\x05'),
+    ('u32', 'little', b'\x05\x00\x00\x00'),
+    ('varint', 'big', b'\x05')
+])
+async def test_header_formats(streams: Tuple[MemoryByteStream, MemoryByteStream],
+                              header_format: str, byteorder: str, header: bytes) -> None:
+    framed = FramedByteStream(streams[0], header_format, byteorder)  # type: ignore[arg-type]
+    await framed.send(b'hello')
+    assert await streams[1].receive() == header + b'hello'
+
+    await streams[1].send(header + b'world')
+    assert await framed.receive() == b'world'
+
+
+def test_invalid_header_format(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    pytest.raises(ValueError, FramedByteStream, streams[0], 'u8').\
+        match("invalid header format: 'u8'")
+
+
+async def test_varint_multibyte(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    sender = FramedByteStream(streams[0], 'varint')
+    receiver = FramedByteStream(streams[1], 'varint')
+    payload = b'x' * 300
+    await sender.send(payload)
+    assert await streams[1].receive(2) == b'\xac\x02'
+    assert await streams[1].receive() == payload
+    await streams[0].send(b'\xac\x02' + payload)
+    assert await receiver.receive() == payload
+
+
+async def test_split_frames(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    framed = FramedByteStream(streams[1])
+    for part in b'\x00\x00', b'\x00\x03ab', b'c\x00\x00\x00\x01', b'd':
+        await streams[0].send(part)
+
+    assert await framed.receive() == b'abc'
+    assert await framed.receive() == b'd'
+
+
+async def test_large_frame(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    sender = FramedByteStream(streams[0])
+    receiver = FramedByteStream(streams[1])
+    payload = bytes(range(256)) * 1000
+    await sender.send(payload)
+    assert await receiver.receive() == payload
+
+
+async def test_max_frame_size(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    sender = FramedByteStream(streams[0], max_frame_size=4)
+    receiver = FramedByteStream(streams[1], max_frame_size=4)
+    with pytest.raises(ValueError, match=r'the frame is too large \(5 > 4 bytes\)'):
+        await sender.send(b'hello')
+
+    await streams[0].send(b'\x00\x00\x00\x05hello')
+    with pytest.raises(BrokenResourceError):
+        await receiver.receive()
+    with pytest.raises(BrokenResourceError):
+        await receiver.receive()
+
+
+def test_max_frame_size_u16(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    assert FramedByteStream(streams[0], 'u16').max_frame_size == 65535
+
+
+async def test_receive_batch(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    sender = FramedByteStream(streams[0])
+    receiver = FramedByteStream(streams[1])
+    await sender.send_many([b'a', b'bc', b'def'])
+    await sender.send(b'ghij')
+    assert await receiver.receive_batch(2) == [b'a', b'bc']
+    assert await receiver.receive_batch() == [b'def', b'ghij']
+
+
+async def test_end_of_stream(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    receiver = FramedByteStream(streams[1])
+    await streams[0].send(b'\x00\x00\x00\x01a')
+    await streams[0].send_eof()
+    assert await receiver.receive() == b'a'
+    with pytest.raises(EndOfStream):
+        await receiver.receive()
+
+
+async def test_incomplete_frame(streams: Tuple[MemoryByteStream, MemoryByteStream]) -> None:
+    receiver = FramedByteStream(streams[1])
+    await streams[0].send(b'\x00\x00\x00\x02a')
+    await streams[0].send_eof()
+    with pytest.raises(IncompleteRead):
+        await receiver.receive()
+
+
+async def test_object_stream_transport() -> None:
+    send1, receive1 = create_memory_object_stream(10)
+    send2, receive2 = create_memory_object_stream(10)
+    framed = FramedByteStream(StapledObjectStream(send1, receive2), 'u16')
+    await framed.send(b'abc')
+    assert await receive1.receive() == b'\x00\x03abc'
+    await send2.send(b'\x00\x02de\x00')
+    await send2.send(b'\x01f')
+    assert await framed.receive_batch() == [b'de']
+    assert await framed.receive() == b'f'
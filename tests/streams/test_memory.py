@@ -1,11 +1,18 @@
-from typing import List, Union
+import json
+import math
+import threading
+from typing import Any, Dict, List, Tuple, Union
 
 import pytest
 
 from anyio import (
-    BrokenResourceError, CancelScope, ClosedResourceError, EndOfStream, WouldBlock,
-    create_memory_object_stream, create_task_group, fail_after, wait_all_tasks_blocked)
-from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+    BrokenResourceError, BusyResourceError, CancelScope, ClosedResourceError, EndOfStream,
+    WouldBlock, create_memory_byte_stream_pair, create_memory_object_broadcast_stream, create_memory_object_partitioned_stream,
+    create_memory_object_spilling_stream, create_memory_object_stream,
+    create_memory_object_threadsafe_stream, create_task_group, fail_after, run, to_thread,
+    wait_all_tasks_blocked)
+from anyio.streams.memory import (
+    MemoryObjectBroadcastReceiveStream, MemoryObjectReceiveStream, MemoryObjectSendStream)
 
 pytestmark = pytest.mark.anyio
 
@@ -36,6 +43,20 @@ async def test_receive_then_send() -> None:
     assert received_objects == ['hello', 'anyio']
 
 
+async def test_receive_none_item() -> None:
+    async def receiver() -> None:
+        received_objects.append(await receive.receive())
+
+    send, receive = create_memory_object_stream(0)
+    received_objects: List[None] = []
+    async with create_task_group() as tg:
+        tg.start_soon(receiver)
+        await wait_all_tasks_blocked()
+        await send.send(None)
+
+    assert received_objects == [None]
+
+
 async def test_receive_then_send_nowait() -> None:
     async def receiver() -> None:
         received_objects.append(await receive.receive())
@@ -332,3 +353,607 @@ async def test_sync_close() -> None:
 
     with pytest.raises(ClosedResourceError):
         receive_stream.receive_nowait()
+
+
+async def test_send_many_receive_nowait_batch() -> None:
+    send, receive = create_memory_object_stream(3)
+    await send.send_many(['a', 'b', 'c'])
+    assert receive.receive_nowait_batch() == ['a', 'b', 'c']
+    with pytest.raises(WouldBlock):
+        receive.receive_nowait_batch()
+
+
+async def test_receive_nowait_batch_max_items() -> None:
+    send, receive = create_memory_object_stream(3)
+    await send.send_many(['a', 'b', 'c'])
+    assert receive.receive_nowait_batch(2) == ['a', 'b']
+    assert receive.receive_nowait_batch(2) == ['c']
+    pytest.raises(ValueError, receive.receive_nowait_batch, 0).\
+        match('max_items must be at least 1')
+
+
+async def test_receive_nowait_batch_from_waiting_senders() -> None:
+    send, receive = create_memory_object_stream(1)
+    send.send_nowait('a')
+    async with create_task_group() as tg:
+        tg.start_soon(send.send, 'b')
+        await wait_all_tasks_blocked()
+        tg.start_soon(send.send, 'c')
+        await wait_all_tasks_blocked()
+        tg.start_soon(send.send, 'd')
+        await wait_all_tasks_blocked()
+        assert receive.receive_nowait_batch(2) == ['a', 'b']
+        assert receive.statistics().current_buffer_used == 1
+        assert receive.statistics().tasks_waiting_send == 1
+        assert receive.receive_nowait_batch() == ['c', 'd']
+
+
+async def test_receive_nowait_batch_end_of_stream() -> None:
+    send, receive = create_memory_object_stream(1)
+    send.send_nowait('a')
+    await send.aclose()
+    assert receive.receive_nowait_batch() == ['a']
+    pytest.raises(EndOfStream, receive.receive_nowait_batch)
+
+
+async def test_receive_batch_waits() -> None:
+    async def receiver() -> None:
+        received.append(await receive.receive_batch())
+
+    received: List[List[str]] = []
+    send, receive = create_memory_object_stream(5)
+    async with create_task_group() as tg:
+        tg.start_soon(receiver)
+        await wait_all_tasks_blocked()
+        send.send_nowait('a')
+        send.send_nowait('b')
+        send.send_nowait('c')
+
+    assert received == [['a', 'b', 'c']]
+
+
+async def test_send_many_blocks_when_full() -> None:
+    send, receive = create_memory_object_stream(1)
+    async with create_task_group() as tg:
+        tg.start_soon(send.send_many, ['a', 'b', 'c'])
+        await wait_all_tasks_blocked()
+        assert receive.statistics().current_buffer_used == 1
+        assert receive.statistics().tasks_waiting_send == 1
+        assert await receive.receive_batch() == ['a', 'b']
+        await wait_all_tasks_blocked()
+        assert await receive.receive_batch() == ['c']
+
+
+async def test_iter_batches() -> None:
+    async def receiver() -> None:
+        async for batch in receive.iter_batches(2):
+            received.append(batch)
+
+    received: List[List[int]] = []
+    send, receive = create_memory_object_stream(10)
+    await send.send_many(range(5))
+    await send.aclose()
+    async with create_task_group() as tg:
+        tg.start_soon(receiver)
+
+    assert received == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.parametrize('max_buffer_size', [0, math.inf])
+def test_overflow_policy_unbounded_buffer(max_buffer_size: float) -> None:
+    pytest.raises(ValueError, create_memory_object_stream, max_buffer_size,
+                  overflow_policy='drop_oldest').\
+        match('the drop_oldest policy requires a finite, nonzero max_buffer_size')
+
+
+def test_invalid_overflow_policy() -> None:
+    pytest.raises(ValueError, create_memory_object_stream, 1, overflow_policy='foo').\
+        match("invalid overflow policy: 'foo'")
+
+
+def test_coalesce_key_without_coalesce_policy() -> None:
+    pytest.raises(ValueError, create_memory_object_stream, 1, coalesce_key=len).\
+        match('coalesce_key must be given if and only if the overflow policy is coalesce')
+
+
+async def test_overflow_drop_oldest() -> None:
+    send, receive = create_memory_object_stream(2, overflow_policy='drop_oldest')
+    for item in 'abcd':
+        await send.send(item)
+
+    assert receive.statistics().items_dropped == 2
+    assert receive.receive_nowait_batch() == ['c', 'd']
+
+
+async def test_overflow_drop_newest() -> None:
+    send, receive = create_memory_object_stream(2, overflow_policy='drop_newest')
+    for item in 'abcd':
+        await send.send(item)
+
+    assert receive.statistics().items_dropped == 2
+    assert receive.receive_nowait_batch() == ['a', 'b']
+
+
+async def test_overflow_coalesce() -> None:
+    send, receive = create_memory_object_stream(2, overflow_policy='coalesce',
+                                                coalesce_key=lambda item: item[0])
+    for item in ('a', 1), ('b', 1), ('a', 2), ('c', 1), ('c', 2):
+        await send.send(item)
+
+    statistics = receive.statistics()
+    assert statistics.items_coalesced == 2
+    assert statistics.items_dropped == 1
+    assert receive.receive_nowait() == ('b', 1)
+    assert receive.receive_nowait() == ('c', 2)
+    with pytest.raises(WouldBlock):
+        receive.receive_nowait()
+
+
+async def test_overflow_policy_waiting_receiver() -> None:
+    async def receiver() -> None:
+        received.append(await receive.receive())
+
+    received: List[str] = []
+    send, receive = create_memory_object_stream(1, overflow_policy='drop_newest')
+    async with create_task_group() as tg:
+        tg.start_soon(receiver)
+        await wait_all_tasks_blocked()
+        await send.send('a')
+        await send.send('b')
+        await send.send('c')
+
+    assert received == ['a']
+    assert receive.receive_nowait() == 'b'
+    assert receive.statistics().items_dropped == 1
+
+
+
+def test_byte_budget_with_overflow_policy() -> None:
+    pytest.raises(ValueError, create_memory_object_stream, 1, overflow_policy='drop_oldest',
+                  max_buffer_bytes=10).\
+        match('max_buffer_bytes can only be used with the block overflow policy')
+
+
+def test_item_size_without_byte_budget() -> None:
+    pytest.raises(ValueError, create_memory_object_stream, 1, item_size=len).\
+        match('item_size can only be used together with max_buffer_bytes')
+
+
+async def test_byte_budget() -> None:
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=10)
+    send.send_nowait(b'12345')
+    send.send_nowait(b'1234')
+    pytest.raises(WouldBlock, send.send_nowait, b'12')
+    send.send_nowait(b'1')
+    statistics = send.statistics()
+    assert statistics.current_buffer_bytes == 10
+    assert statistics.max_buffer_bytes == 10
+
+    async with create_task_group() as tg:
+        tg.start_soon(send.send, b'123456')
+        await wait_all_tasks_blocked()
+        pytest.raises(WouldBlock, send.send_nowait, b'')
+        assert receive.receive_nowait() == b'12345'
+        assert send.statistics().tasks_waiting_send == 1
+        assert receive.receive_nowait() == b'1234'
+
+    assert send.statistics().current_buffer_bytes == 7
+    assert receive.receive_nowait_batch() == [b'1', b'123456']
+    assert send.statistics().current_buffer_bytes == 0
+
+
+async def test_byte_budget_oversized_item() -> None:
+    send, receive = create_memory_object_stream(math.inf, max_buffer_bytes=10,
+                                                item_size=lambda item: item['size'])
+    send.send_nowait({'size': 20})
+    pytest.raises(WouldBlock, send.send_nowait, {'size': 1})
+    assert receive.statistics().current_buffer_bytes == 20
+    assert receive.receive_nowait() == {'size': 20}
+    send.send_nowait({'size': 1})
+
+class TestBroadcast:
+    def test_invalid_max_buffer(self) -> None:
+        pytest.raises(ValueError, create_memory_object_broadcast_stream, 0).\
+            match('max_buffer_size must be at least 1')
+
+    def test_invalid_policy(self) -> None:
+        pytest.raises(ValueError, create_memory_object_broadcast_stream, 1,
+                      slow_consumer_policy='foo').match("invalid slow consumer policy: 'foo'")
+
+    async def test_every_subscriber_gets_every_item(self) -> None:
+        async def subscriber(stream: MemoryObjectBroadcastReceiveStream[int]) -> None:
+            async with stream:
+                received.append([item async for item in stream])
+
+        received: List[List[int]] = []
+        send, receive = create_memory_object_broadcast_stream(2, int)
+        async with create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(subscriber, receive.clone())
+
+            receive.close()
+            async with send:
+                for i in range(5):
+                    await send.send(i)
+
+        assert received == [[0, 1, 2, 3, 4]] * 3
+
+    async def test_block_slow_subscriber(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(2)
+        receive2 = receive.clone()
+        send.send_nowait('a')
+        send.send_nowait('b')
+        assert receive.receive_nowait() == 'a'
+        assert receive.receive_nowait() == 'b'
+        pytest.raises(WouldBlock, send.send_nowait, 'c')
+        assert receive.statistics().subscriber_lags == (0, 2)
+
+        async with create_task_group() as tg:
+            tg.start_soon(send.send, 'c')
+            await wait_all_tasks_blocked()
+            assert send.statistics().tasks_waiting_send == 1
+            assert receive2.receive_nowait() == 'a'
+
+        assert send.statistics().current_buffer_used == 2
+        assert receive.receive_nowait() == 'c'
+        assert receive2.receive_nowait() == 'b'
+        assert receive2.receive_nowait() == 'c'
+        assert send.statistics().current_buffer_used == 0
+
+    async def test_drop_oldest(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(
+            2, slow_consumer_policy='drop_oldest')
+        receive2 = receive.clone()
+        for item in 'abcd':
+            send.send_nowait(item)
+            assert receive.receive_nowait() == item
+
+        assert send.statistics().items_dropped == 2
+        assert receive2.receive_nowait() == 'c'
+        assert receive2.receive_nowait() == 'd'
+
+    async def test_disconnect(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(
+            1, slow_consumer_policy='disconnect')
+        receive2 = receive.clone()
+        send.send_nowait('a')
+        assert receive.receive_nowait() == 'a'
+        send.send_nowait('b')
+        assert send.statistics().open_receive_streams == 1
+        pytest.raises(BrokenResourceError, receive2.receive_nowait)
+        assert receive.receive_nowait() == 'b'
+
+    async def test_close_all_subscribers_while_sending(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(1)
+        send.send_nowait('a')
+        with pytest.raises(BrokenResourceError):
+            async with create_task_group() as tg:
+                tg.start_soon(send.send, 'b')
+                await wait_all_tasks_blocked()
+                receive.close()
+
+    async def test_cancel_receive(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(1)
+        async with create_task_group() as tg:
+            tg.start_soon(receive.receive)
+            await wait_all_tasks_blocked()
+            tg.cancel_scope.cancel()
+
+        send.send_nowait('a')
+        assert receive.receive_nowait() == 'a'
+
+    async def test_end_of_stream(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(1)
+        with pytest.raises(EndOfStream):
+            async with create_task_group() as tg:
+                tg.start_soon(receive.receive)
+                await wait_all_tasks_blocked()
+                send.close()
+
+    async def test_closed(self) -> None:
+        send, receive = create_memory_object_broadcast_stream(1)
+        receive2 = receive.clone()
+        with send, receive:
+            pass
+
+        pytest.raises(ClosedResourceError, send.send_nowait, 'a')
+        pytest.raises(ClosedResourceError, receive.receive_nowait)
+        pytest.raises(EndOfStream, receive2.receive_nowait)
+
+
+class TestThreadSafe:
+    def test_invalid_max_buffer(self) -> None:
+        pytest.raises(ValueError, create_memory_object_threadsafe_stream, 0).\
+            match('max_buffer_size must be at least 1')
+
+    async def test_send_from_worker_thread(self) -> None:
+        def produce() -> None:
+            with send:
+                for i in range(1000):
+                    send.send_blocking(i)
+
+        send, receive = create_memory_object_threadsafe_stream(10)
+        received: List[int] = []
+        async with create_task_group() as tg:
+            tg.start_soon(to_thread.run_sync, produce)
+            async for batch in receive.iter_batches():
+                received.extend(batch)
+
+        assert received == list(range(1000))
+
+    async def test_send_from_other_event_loop(self) -> None:
+        async def produce() -> None:
+            with send:
+                for i in range(100):
+                    await send.send(i)
+
+        send, receive = create_memory_object_threadsafe_stream(5)
+        thread = threading.Thread(target=run, args=[produce])
+        thread.start()
+        try:
+            received = [item async for item in receive]
+        finally:
+            thread.join()
+
+        assert received == list(range(100))
+
+    async def test_send_nowait_full(self) -> None:
+        send, receive = create_memory_object_threadsafe_stream(2)
+        assert send.send_nowait_many(['a', 'b', 'c']) == 2
+        pytest.raises(WouldBlock, send.send_nowait, 'c')
+        pytest.raises(WouldBlock, send.send_blocking, 'c', timeout=0)
+        assert receive.receive_nowait() == 'a'
+        send.send_nowait('c')
+        assert receive.receive_nowait_batch() == ['b', 'c']
+        pytest.raises(WouldBlock, receive.receive_nowait)
+
+    async def test_send_waits_for_room(self) -> None:
+        send, receive = create_memory_object_threadsafe_stream(1)
+        send.send_nowait('a')
+        async with create_task_group() as tg:
+            tg.start_soon(send.send, 'b')
+            await wait_all_tasks_blocked()
+            assert receive.statistics().tasks_waiting_send == 1
+            assert await receive.receive() == 'a'
+
+        assert await receive.receive() == 'b'
+
+    async def test_cancel_receive(self) -> None:
+        send, receive = create_memory_object_threadsafe_stream(1)
+        async with create_task_group() as tg:
+            tg.start_soon(receive.receive)
+            await wait_all_tasks_blocked()
+            assert receive.statistics().tasks_waiting_receive == 1
+            tg.cancel_scope.cancel()
+
+        assert receive.statistics().tasks_waiting_receive == 0
+        send.send_nowait('a')
+        assert await receive.receive() == 'a'
+
+    async def test_close_receive_while_sending(self) -> None:
+        send, receive = create_memory_object_threadsafe_stream(1)
+        send.send_nowait('a')
+        with pytest.raises(BrokenResourceError):
+            async with create_task_group() as tg:
+                tg.start_soon(to_thread.run_sync, send.send_blocking, 'b')
+                while not receive.statistics().tasks_waiting_send:
+                    await wait_all_tasks_blocked()
+
+                receive.close()
+
+    async def test_closed(self) -> None:
+        send, receive = create_memory_object_threadsafe_stream(1)
+        receive2 = receive.clone()
+        with send, receive:
+            pass
+
+        pytest.raises(ClosedResourceError, send.send_nowait, 'a')
+        pytest.raises(ClosedResourceError, receive.receive_nowait)
+        pytest.raises(EndOfStream, receive2.receive_nowait)
+
+
+class TestPartitioned:
+    def test_invalid_partitions(self) -> None:
+        pytest.raises(ValueError, create_memory_object_partitioned_stream, 0, key=hash).\
+            match('partitions must be a positive integer')
+
+    async def test_per_key_ordering(self) -> None:
+        async def consumer(stream: MemoryObjectReceiveStream[Tuple[int, int]]) -> None:
+            async with stream:
+                async for key, value in stream:
+                    received.setdefault(key, []).append(value)
+
+        received: Dict[int, List[int]] = {}
+        send, receives = create_memory_object_partitioned_stream(
+            3, 2, Tuple[int, int], key=lambda item: item[0])
+        async with create_task_group() as tg:
+            for receive in receives:
+                tg.start_soon(consumer, receive)
+
+            async with send:
+                await send.send_many((i % 5, i) for i in range(50))
+
+        assert received == {key: list(range(key, 50, 5)) for key in range(5)}
+
+    async def test_per_partition_backpressure(self) -> None:
+        send, receives = create_memory_object_partitioned_stream(2, 1, key=lambda item: item)
+        first = send.partition_for(0)
+        other = next(item for item in range(1, 100) if send.partition_for(item) != first)
+        send.send_nowait(0)
+        pytest.raises(WouldBlock, send.send_nowait, 0)
+        send.send_nowait(other)
+        statistics = send.statistics()
+        assert [stats.current_buffer_used for stats in statistics] == [1, 1]
+        assert receives[first].receive_nowait() == 0
+        assert receives[1 - first].receive_nowait() == other
+
+    async def test_close(self) -> None:
+        send, receives = create_memory_object_partitioned_stream(2, 1, key=hash)
+        clone = send.clone()
+        send.close()
+        pytest.raises(ClosedResourceError, send.send_nowait, 1)
+        pytest.raises(WouldBlock, receives[0].receive_nowait)
+        clone.close()
+        for receive in receives:
+            pytest.raises(EndOfStream, receive.receive_nowait)
+
+
+class TestSpilling:
+    @pytest.mark.parametrize('kwargs, message', [
+        ({'max_buffer_size': 0}, 'max_buffer_size must be a positive integer'),
+        ({'max_buffer_size': math.inf}, 'max_buffer_size must be a positive integer'),
+        ({'max_buffer_size': 1, 'spill_batch_size': 0},
+         'spill_batch_size must be a positive integer')
+    ])
+    def test_invalid_arguments(self, kwargs: Dict[str, Any], message: str) -> None:
+        pytest.raises(ValueError, create_memory_object_spilling_stream, **kwargs).match(message)
+
+    async def test_spill_and_read_back(self) -> None:
+        send, receive = create_memory_object_spilling_stream(5, spill_batch_size=10)
+        for i in range(50):
+            await send.send(i)
+
+        statistics = send.statistics()
+        assert statistics.current_buffer_used == 5
+        assert statistics.items_spilled == 40
+        assert statistics.items_pending == 5
+        assert statistics.spilled_bytes > 0
+
+        send.close()
+        assert [item async for item in receive] == list(range(50))
+        statistics = receive.statistics()
+        assert statistics.items_spilled == 0
+        assert statistics.spilled_bytes == 0
+
+    async def test_receive_nowait_spilled(self) -> None:
+        send, receive = create_memory_object_spilling_stream(1, spill_batch_size=1)
+        for item in 'abc':
+            await send.send(item)
+
+        assert receive.receive_nowait() == 'a'
+        pytest.raises(WouldBlock, receive.receive_nowait)
+        assert await receive.receive() == 'b'
+        assert receive.receive_nowait() == 'c'
+
+    async def test_concurrent_consumer(self) -> None:
+        async def consumer() -> None:
+            async with receive:
+                async for item in receive:
+                    received.append(item)
+
+        received: List[int] = []
+        send, receive = create_memory_object_spilling_stream(3, int, spill_batch_size=4)
+        async with create_task_group() as tg:
+            tg.start_soon(consumer)
+            async with send:
+                for i in range(200):
+                    await send.send(i)
+
+        assert received == list(range(200))
+
+    async def test_custom_codec(self) -> None:
+        send, receive = create_memory_object_spilling_stream(
+            1, spill_batch_size=1, dumps=lambda item: json.dumps(item).encode(),
+            loads=json.loads)
+        for i in range(3):
+            await send.send({'a': i})
+
+        assert receive.statistics().items_spilled == 1
+        for i in range(3):
+            assert await receive.receive() == {'a': i}
+
+    async def test_close_receive_stream(self) -> None:
+        send, receive = create_memory_object_spilling_stream(1, spill_batch_size=1)
+        for i in range(3):
+            await send.send(i)
+
+        receive.close()
+        assert send.statistics().items_spilled == 0
+        with pytest.raises(BrokenResourceError):
+            await send.send(3)
+
+
+class TestMemoryByteStream:
+    def test_invalid_max_buffer(self) -> None:
+        pytest.raises(ValueError, create_memory_byte_stream_pair, 0).\
+            match('max_buffer_bytes must be at least 1')
+
+    async def test_send_receive(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair()
+        data = b'x' * 100
+        await stream1.send(data)
+        assert await stream2.receive() is data
+        await stream2.send(bytearray(b'reply'))
+        assert await stream1.receive() == b'reply'
+
+    async def test_receive_partial(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair()
+        await stream1.send(b'abcdef')
+        await stream1.send(b'gh')
+        await stream1.send(b'ijk')
+        assert await stream2.receive(4) == b'abcd'
+        assert await stream2.receive(5) == b'efghi'
+        assert await stream2.receive() == b'jk'
+
+    async def test_backpressure(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair(4)
+        await stream1.send(b'abcdef')
+        with pytest.raises(TimeoutError), fail_after(0.1):
+            await stream1.send(b'gh')
+
+        async with create_task_group() as tg:
+            tg.start_soon(stream1.send, b'gh')
+            await wait_all_tasks_blocked()
+            assert await stream2.receive(3) == b'abc'
+
+        assert await stream2.receive() == b'defgh'
+
+    async def test_receive_into(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair()
+        await stream1.send(b'abc')
+        await stream1.send(b'defg')
+        buffer = bytearray(5)
+        assert await stream2.receive_into(buffer) == 5
+        assert buffer == b'abcde'
+        assert await stream2.receive_into(buffer) == 2
+        assert buffer[:2] == b'fg'
+
+    async def test_send_eof(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair()
+        await stream1.send(b'abc')
+        await stream1.send_eof()
+        with pytest.raises(ClosedResourceError):
+            await stream1.send(b'def')
+
+        assert await stream2.receive() == b'abc'
+        with pytest.raises(EndOfStream):
+            await stream2.receive()
+
+        await stream2.send(b'def')
+        assert await stream1.receive() == b'def'
+
+    async def test_close(self) -> None:
+        async def receive() -> None:
+            with pytest.raises(ClosedResourceError):
+                await stream1.receive()
+
+        stream1, stream2 = create_memory_byte_stream_pair()
+        async with create_task_group() as tg:
+            tg.start_soon(receive)
+            await wait_all_tasks_blocked()
+            await stream1.aclose()
+
+        with pytest.raises(EndOfStream):
+            await stream2.receive()
+        with pytest.raises(BrokenResourceError):
+            await stream2.send(b'abc')
+
+    async def test_concurrent_receive(self) -> None:
+        stream1, stream2 = create_memory_byte_stream_pair()
+        async with create_task_group() as tg:
+            tg.start_soon(stream2.receive)
+            await wait_all_tasks_blocked()
+            with pytest.raises(BusyResourceError):
+                await stream2.receive()
+
+            await stream1.send(b'abc')
@@ -0,0 +1,122 @@
+import threading
+from typing import List
+
+import pytest
+
+from anyio import (
+    BrokenResourceError, BusyResourceError, ClosedResourceError, EndOfStream, WouldBlock,
+    create_task_group, to_process, to_thread, wait_all_tasks_blocked)
+
+shared_memory = pytest.importorskip('anyio.streams.shared_memory',
+                                    reason='Shared memory requires Python 3.8+')
+SharedMemoryChannel = shared_memory.SharedMemoryChannel
+
+pytestmark = pytest.mark.anyio
+
+
+def produce(channel: 'shared_memory.SharedMemoryChannel', count: int) -> None:
+    with channel.open_send_stream() as send:
+        for i in range(count):
+            send.send_blocking(b'message %d' % i)
+
+
+@pytest.fixture
+def channel() -> 'shared_memory.SharedMemoryChannel':
+    with SharedMemoryChannel(64) as channel:
+        yield channel
+
+
+async def test_send_receive(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream() as send, channel.open_receive_stream() as receive:
+        pytest.raises(WouldBlock, receive.receive_nowait)
+        await send.send(b'hello')
+        await send.send(bytearray(b'world'))
+        assert await receive.receive() == b'hello'
+        assert receive.receive_nowait() == b'world'
+
+
+async def test_wrap_around(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream() as send, channel.open_receive_stream() as receive:
+        for i in range(100):
+            message = b'%d' % i * 3
+            send.send_nowait(message)
+            assert receive.receive_nowait() == message
+
+
+async def test_send_blocks_when_full(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream() as send, channel.open_receive_stream() as receive:
+        send.send_nowait(b'x' * 40)
+        pytest.raises(WouldBlock, send.send_nowait, b'y' * 20)
+        async with create_task_group() as tg:
+            tg.start_soon(send.send, b'y' * 20)
+            await wait_all_tasks_blocked()
+            assert await receive.receive() == b'x' * 40
+
+        assert await receive.receive() == b'y' * 20
+
+
+async def test_receive_waits(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    received: List[bytes] = []
+    with channel.open_receive_stream() as receive:
+        thread = threading.Thread(target=produce, args=[channel, 50])
+        thread.start()
+        try:
+            async for message in receive:
+                received.append(message)
+        finally:
+            thread.join()
+
+    assert received == [b'message %d' % i for i in range(50)]
+
+
+async def test_receive_blocking(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    async def receive_in_thread() -> None:
+        received.append(await to_thread.run_sync(receive.receive_blocking))
+
+    received: List[bytes] = []
+    with channel.open_send_stream() as send, channel.open_receive_stream() as receive:
+        pytest.raises(WouldBlock, receive.receive_blocking, 0)
+        async with create_task_group() as tg:
+            tg.start_soon(receive_in_thread)
+            await send.send(b'hello')
+
+    assert received == [b'hello']
+
+
+async def test_to_process_worker() -> None:
+    with SharedMemoryChannel(4096) as channel:
+        with channel.open_receive_stream() as receive:
+            async with create_task_group() as tg:
+                tg.start_soon(to_process.run_sync, produce, channel, 1000)
+                received = [message async for message in receive]
+
+    assert received == [b'message %d' % i for i in range(1000)]
+
+
+async def test_message_too_large(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream() as send, channel.open_receive_stream():
+        pytest.raises(ValueError, send.send_nowait, b'x' * 61).\
+            match(r'the message is too large for the buffer \(61 > 60 bytes\)')
+
+
+async def test_end_of_stream(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_receive_stream() as receive:
+        with channel.open_send_stream() as send:
+            await send.send(b'hello')
+
+        pytest.raises(ClosedResourceError, send.send_nowait, b'hello')
+        assert await receive.receive() == b'hello'
+        with pytest.raises(EndOfStream):
+            await receive.receive()
+
+
+async def test_receiver_closed(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream() as send:
+        channel.open_receive_stream().close()
+        with pytest.raises(BrokenResourceError):
+            await send.send(b'hello')
+
+
+async def test_open_twice(channel: 'shared_memory.SharedMemoryChannel') -> None:
+    with channel.open_send_stream():
+        pytest.raises(BusyResourceError, channel.open_send_stream)